@@ -1,18 +1,21 @@
 # combine_csv_to_MIT805A1.py
-import pandas as pd
-import subprocess
+#
+# Stream the monthly 2025 CSVs in HDFS into one file with a filedate column,
+# chunk by chunk (see csv_combine.py): memory stays at one chunk however many
+# months there are, and the combined file is written straight into HDFS.
+# With --concat the months are appended byte for byte instead and filedate
+# is kept in a sidecar index next to the output; read_combined() adds it back.
+#
+#   python combine_csv_files.py
+#   python combine_csv_files.py --local-store /tmp/fake_hdfs   # no cluster needed
+#   python combine_csv_files.py --concat                       # months with the same header
 import os
-import tempfile
-from datetime import datetime
+import argparse
 
-def run_command(command):
-    """Run a command and return True if successful, False otherwise"""
-    try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        return result.returncode == 0
-    except Exception as e:
-        print(f"Exception running command: {e}")
-        return False
+from csv_combine import combine_file, concat_file, index_path, report_index, DEFAULT_CHUNK_ROWS
+from stores import HdfsStore, LocalStore
+
+INPUT_PATH = "/user/MukondeleliNegukhula/nyc_taxi/csv_yellow_2025/"
 
 def extract_date_from_filename(filename):
     """Extract date from filename like yellow_tripdata_2025-01.csv"""
@@ -25,109 +28,73 @@ def extract_date_from_filename(filename):
         return None
 
 def main():
+    parser = argparse.ArgumentParser(description="Combine the monthly 2025 CSVs in HDFS with a filedate column")
+    parser.add_argument("--input-path", default=INPUT_PATH, help=f"HDFS folder of the monthly CSVs (default {INPUT_PATH})")
+    parser.add_argument("--local-store", help="use this local folder instead of HDFS (for testing)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"rows per chunk (default {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument("--concat", action="store_true",
+                        help="append the files unparsed and keep filedate in a sidecar index (same headers only)")
+    args = parser.parse_args()
+    store = LocalStore(args.local_store) if args.local_store else HdfsStore()
+
     print("Combining 2025 CSV files and saving to /MIT805A1 folder...")
-    
+
     # Create the /MIT805A1 directory in HDFS if it doesn't exist
     output_path = "/MIT805A1/"
-    run_command(f"hdfs dfs -mkdir -p {output_path}")
-    
-    # Create a temporary directory for processing
-    with tempfile.TemporaryDirectory() as temp_dir:
-        all_data_frames = []
-        
-        # List all CSV files in the HDFS directory
-        print("Listing CSV files in HDFS...")
-        result = subprocess.run(f"hdfs dfs -ls /user/MukondeleliNegukhula/nyc_taxi/csv_yellow_2025/", 
-                              shell=True, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            print("❌ Failed to list HDFS files")
-            return
-        
-        # Parse the output to get file names
-        lines = result.stdout.strip().split('\n')
-        csv_files = []
-        for line in lines:
-            if line.strip() and '.csv' in line:
-                parts = line.split()
-                if len(parts) >= 8:
-                    csv_files.append(parts[-1])
-        
-        print(f"Found {len(csv_files)} CSV files to process")
-        
-        # Process each CSV file
-        for hdfs_file_path in csv_files:
-            filename = os.path.basename(hdfs_file_path)
-            print(f"Processing {filename}...")
-            
-            # Extract date from filename
-            filedate = extract_date_from_filename(filename)
-            if not filedate:
-                print(f"  ⚠️  Could not extract date from filename: {filename}")
-                continue
-            
-            local_csv = os.path.join(temp_dir, filename)
-            
-            # 1. Download from HDFS to local
-            if not run_command(f"hdfs dfs -get {hdfs_file_path} {local_csv}"):
-                print(f"  ❌ Failed to download {filename}")
-                continue
-            
-            # 2. Read CSV and add filedate column
-            try:
-                print(f"  Reading {filename}...")
-                df = pd.read_csv(local_csv)
-                df['filedate'] = filedate  # Add the new column
-                all_data_frames.append(df)
-                print(f"  ✅ Added {len(df)} rows with filedate: {filedate}")
-            except Exception as e:
-                print(f"  ❌ Failed to process {filename}: {e}")
-                continue
-        
-        if not all_data_frames:
-            print("❌ No data frames to combine")
-            return
-        
-        # 3. Combine all DataFrames
-        print("Combining all data...")
-        combined_df = pd.concat(all_data_frames, ignore_index=True)
-        
-        # 4. Save combined CSV
-        combined_filename = "nyc_taxi_2025_combined_yellow.csv"
-        local_combined_path = os.path.join(temp_dir, combined_filename)
-        
-        print(f"Saving combined file with {len(combined_df)} rows...")
-        combined_df.to_csv(local_combined_path, index=False)
-        
-        # 5. Upload combined file to /MIT805A1 folder in HDFS
-        hdfs_final_path = f"{output_path}{combined_filename}"
-        print(f"Uploading to {hdfs_final_path}...")
-        
-        if run_command(f"hdfs dfs -put {local_combined_path} {hdfs_final_path}"):
-            print(f"✅ Successfully created combined file: {hdfs_final_path}")
-            
-            # Verify the file was uploaded
-            print("Verifying upload...")
-            run_command(f"hdfs dfs -ls {output_path}")
-            run_command(f"hdfs dfs -du -h {hdfs_final_path}")
-        else:
-            print("❌ Failed to upload combined file")
-        
-        # Show some statistics
+    store.mkdir(output_path)
+
+    # List all CSV files in the HDFS directory
+    print("Listing CSV files in HDFS...")
+    csv_files = [path for path in store.list(args.input_path) if path.endswith('.csv')]
+    print(f"Found {len(csv_files)} CSV files to process")
+
+    inputs = []
+    for hdfs_file_path in csv_files:
+        filename = os.path.basename(hdfs_file_path)
+
+        # Extract date from filename
+        filedate = extract_date_from_filename(filename)
+        if not filedate:
+            print(f"  ⚠️  Could not extract date from filename: {filename}")
+            continue
+        inputs.append((hdfs_file_path, {"filedate": filedate}))
+
+    if not inputs:
+        print("❌ No files to combine")
+        return
+
+    # Stream every month into the combined file in HDFS
+    combined_filename = "nyc_taxi_2025_combined_yellow.csv"
+    hdfs_final_path = f"{output_path}{combined_filename}"
+    print(f"Writing to {hdfs_final_path}...")
+    if args.concat:
+        index = concat_file(store, inputs, hdfs_final_path)
+        print(f"✅ Successfully created combined file: {hdfs_final_path}")
         print("\n📊 Combined File Statistics:")
-        print(f"Total rows: {len(combined_df):,}")
-        print(f"Total columns: {len(combined_df.columns)}")
-        print(f"Date range: {combined_df['filedate'].min()} to {combined_df['filedate'].max()}")
-        print(f"File size: {os.path.getsize(local_combined_path) / (1024*1024):.2f} MB")
-        
-        # Show sample of the data with the new field
-        print("\nSample data with filedate:")
-        print(combined_df[['filedate'] + list(combined_df.columns[:3])].head())
-        
-        # Show the first few rows with the new filedate column
-        print("\nFirst few rows with the new filedate column:")
-        sample_cols = ['filedate'] + [col for col in combined_df.columns if col != 'filedate'][:4]
-        print(combined_df[sample_cols].head())
+        print(report_index(index))
+        print(f"Date range: {index['sources'][0]['filedate']} to {index['sources'][-1]['filedate']}")
+        print(f"Sources in {index_path(hdfs_final_path)}:")
+        for source in index["sources"]:
+            print(f"  {source['filedate']}: bytes {source['start']:,} to {source['end']:,}")
+        return
+    stats = combine_file(store, inputs, hdfs_final_path, args.chunk_rows)
+    print(f"✅ Successfully created combined file: {hdfs_final_path}")
+
+    # Show some statistics
+    print("\n📊 Combined File Statistics:")
+    print(stats.report())
+    print(f"Total rows: {stats.rows:,}")
+    print(f"Total columns: {len(stats.columns)}")
+    print(f"Date range: {' to '.join(stats.value_range('filedate'))}")
+    print(f"File size: {stats.bytes / (1024*1024):.2f} MB")
+    for filedate, rows, percent in sorted(stats.distribution("filedate")):
+        print(f"  {filedate}: {rows:,} rows ({percent:.1f}%)")
+
+    # Show the first few rows with the new filedate column
+    print("\nFirst few rows with the new filedate column:")
+    sample_cols = ['filedate'] + [col for col in stats.sample.columns if col != 'filedate'][:4]
+    print(stats.sample[sample_cols])
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,10 +1,10 @@
-import pandas as pd
 import glob
 
-files = glob.glob(r"C:\MIT805_A1_Data\data\yellow_trip_local\*.parquet")
+from parquet_to_csv import convert, report
 
-dfs = [pd.read_parquet(f) for f in files]
-big_df = pd.concat(dfs, ignore_index=True)
-big_df.to_csv(r"C:\MIT805_A1_Data\data\yellow_tripdata_combined.csv", index=False)
+files = sorted(glob.glob(r"C:\MIT805_A1_Data\data\yellow_trip_local\*.parquet"))
 
-print("Done! Combined CSV saved.")
+# Streams one record batch at a time instead of concatenating every file in memory
+stats = convert(files, r"C:\MIT805_A1_Data\data\yellow_tripdata_combined.csv")
+
+print(f"Done! Combined CSV saved. {report(stats)}")
@@ -1,76 +1,165 @@
 # convert2023_simple.py
-import pandas as pd
-import subprocess
+#
+# Convert a year of monthly Parquet files in HDFS to CSV, as a pipeline:
+# while month N is converted, month N+1 is downloading and month N-1 is
+# uploading. Each stage has its own worker threads (--download-workers,
+# --convert-workers, --upload-workers) and the stages are joined by small
+# bounded queues, so at most a few months sit on local disk at once. The
+# conversion streams one record batch at a time (see parquet_to_csv.py) and
+# releases the GIL in Arrow, so threads are enough for it too. A year then
+# takes about as long as its slowest stage rather than the sum of all three.
+#
+#   python convert2024_csv.py --year 2025
+#   python convert2024_csv.py --year 2025 --local-store /tmp/fake_hdfs   # no cluster needed
 import os
+import sys
+import time
+import queue
+import shutil
+import argparse
 import tempfile
+import threading
 
-def run_command(command):
-    """Run a command and return True if successful, False otherwise"""
-    try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            return True
-        else:
-            print(f"Command failed: {command}")
-            print(f"Error: {result.stderr}")
-            return False
-    except Exception as e:
-        print(f"Exception running command: {e}")
-        return False
+from parquet_to_csv import convert, report
+from stores import HdfsStore, LocalStore
 
-def main():
-    print("Creating 2023 CSV using local conversion...")
-    
-    # Create output directory in HDFS
-    output_path = "/user/MukondeleliNegukhula/nyc_taxi/csv_yellow_2025/"
-    run_command(f"hdfs dfs -mkdir -p {output_path}")
-    
-    # Process each 2023 file individually
-    for month in range(1, 13):
-        month_str = str(month).zfill(2)  # Convert 1 to '01', 2 to '02', etc.
-        input_file = f"/user/MukondeleliNegukhula/nyc_taxi/raw/yellow_tripdata_2025-{month_str}.parquet"
-        output_file = f"yellow_tripdata_2025-{month_str}.csv"
-        
-        print(f"Processing 2025-{month_str}...")
-        
-        # Check if file exists in HDFS
-        if not run_command(f"hdfs dfs -test -e {input_file}"):
-            print(f"⚠️  File not found: {input_file}")
-            continue
-        
-        # Create a temporary directory for processing
-        with tempfile.TemporaryDirectory() as temp_dir:
-            local_parquet = os.path.join(temp_dir, f"temp_{month_str}.parquet")
-            local_csv = os.path.join(temp_dir, output_file)
-            
-            # 1. Download from HDFS to local
-            print(f"  Downloading {input_file}...")
-            if not run_command(f"hdfs dfs -get {input_file} {local_parquet}"):
-                continue
-            
-            # 2. Convert Parquet to CSV using pandas
-            print(f"  Converting to CSV...")
+RAW_PATH = "/user/MukondeleliNegukhula/nyc_taxi/raw"
+CSV_PATH = "/user/MukondeleliNegukhula/nyc_taxi/csv_{taxi_type}_{year}/"
+STOP = object()
+
+
+class Pipeline:
+    """Worker threads per stage joined by bounded queues, with per-stage timings"""
+
+    def __init__(self, stages, queue_size=2):
+        # stages: [(name, function, workers)]; a function returns the item for the next stage
+        self.stages = stages
+        self.queues = [queue.Queue()] + [queue.Queue(maxsize=queue_size) for _ in stages[1:]]
+        self.timings = {name: [] for name, _, _ in stages}
+        self.failed = []
+        self.lock = threading.Lock()
+
+    def _work(self, index):
+        name, function, _ = self.stages[index]
+        inbox = self.queues[index]
+        while True:
+            item = inbox.get()
+            if item is STOP:
+                inbox.put(STOP)  # let the other workers of this stage see it
+                return
+            started = time.perf_counter()
             try:
-                df = pd.read_parquet(local_parquet)
-                df.to_csv(local_csv, index=False)
-                print(f"  Converted to CSV: {len(df)} rows")
+                result = function(item)
             except Exception as e:
-                print(f"  ❌ Conversion failed: {e}")
+                print(f"  ❌ {item['month']} {name} failed: {e}")
+                with self.lock:
+                    self.failed.append(item["month"])
+                cleanup(item)
                 continue
-            
-            # 3. Upload CSV back to HDFS
-            print(f"  Uploading to HDFS...")
-            if run_command(f"hdfs dfs -put {local_csv} {output_path}"):
-                print(f"  ✅ Successfully processed 2025-{month_str}")
-            else:
-                print(f"  ❌ Upload failed for 2025-{month_str}")
-    
-    print("✅ All 2025 files processed!")
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.timings[name].append(elapsed)
+            print(f"  {name:8} {item['month']} {elapsed:6.1f}s")
+            if result is not None and index + 1 < len(self.stages):
+                self.queues[index + 1].put(result)
+
+    def run(self, items):
+        threads = []
+        for index, (_, _, workers) in enumerate(self.stages):
+            threads.append([threading.Thread(target=self._work, args=(index,), daemon=True)
+                            for _ in range(workers)])
+            for thread in threads[-1]:
+                thread.start()
+        for item in items:
+            self.queues[0].put(item)
+        self.queues[0].put(STOP)
+        # A stage is finished once all its workers are; then the next one is told to stop
+        for index, workers in enumerate(threads):
+            for thread in workers:
+                thread.join()
+            if index + 1 < len(self.stages):
+                self.queues[index + 1].put(STOP)
+
+
+def cleanup(item):
+    for key in ("parquet", "csv"):
+        path = item.get(key)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert monthly Parquet files in HDFS to CSV in a pipeline")
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--months", type=int, nargs="+", default=list(range(1, 13)), help="months to convert")
+    parser.add_argument("--taxi-type", default="yellow")
+    parser.add_argument("--input-path", default=RAW_PATH, help=f"HDFS folder of the Parquet files (default {RAW_PATH})")
+    parser.add_argument("--output-path", help=f"HDFS folder for the CSVs (default {CSV_PATH})")
+    parser.add_argument("--local-store", help="use this local folder instead of HDFS (for testing)")
+    parser.add_argument("--download-workers", type=int, default=2, help="parallel downloads (default 2)")
+    parser.add_argument("--convert-workers", type=int, default=2, help="parallel conversions (default 2)")
+    parser.add_argument("--upload-workers", type=int, default=2, help="parallel uploads (default 2)")
+    parser.add_argument("--queue-size", type=int, default=2, help="months waiting between stages (default 2)")
+    parser.add_argument("--work-dir", help="local scratch folder (default: system temp)")
+    args = parser.parse_args()
+
+    store = LocalStore(args.local_store) if args.local_store else HdfsStore()
+    output_path = args.output_path or CSV_PATH.format(taxi_type=args.taxi_type, year=args.year)
+    print(f"Creating {args.year} CSV using local conversion...")
+    store.mkdir(output_path)
+    work_dir = tempfile.mkdtemp(prefix="convert-", dir=args.work_dir)
+
+    def download(item):
+        if not store.exists(item["source"]):
+            print(f"⚠️  File not found: {item['source']}")
+            return None
+        item["parquet"] = os.path.join(work_dir, f"{item['name']}.parquet")
+        store.get(item["source"], item["parquet"])
+        return item
+
+    def convert_month(item):
+        item["csv"] = os.path.join(work_dir, f"{item['name']}.csv")
+        stats = convert([item["parquet"]], item["csv"])
+        os.remove(item["parquet"])
+        print(f"  Converted {item['month']}: {report(stats)}")
+        return item
+
+    def upload(item):
+        store.put(item["csv"], output_path)
+        os.remove(item["csv"])
+        return item
+
+    items = []
+    for month in args.months:
+        name = f"{args.taxi_type}_tripdata_{args.year}-{month:02d}"
+        items.append({"month": f"{args.year}-{month:02d}", "name": name,
+                      "source": f"{args.input_path.rstrip('/')}/{name}.parquet"})
+
+    pipeline = Pipeline([("download", download, args.download_workers),
+                         ("convert", convert_month, args.convert_workers),
+                         ("upload", upload, args.upload_workers)], args.queue_size)
+    started = time.perf_counter()
+    try:
+        pipeline.run(items)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'stage':8} {'months':>6} {'busy s':>8} {'max s':>7}")
+    for name, timings in pipeline.timings.items():
+        print(f"{name:8} {len(timings):6} {sum(timings):8.1f} {max(timings, default=0):7.1f}")
+    busy = sum(sum(timings) for timings in pipeline.timings.values())
+    print(f"Wall time {elapsed:.1f}s for {busy:.1f}s of stage work")
+
     print(f"Final output in HDFS: {output_path}")
-    
-    # Show the final results
     print("\nFinal output files:")
-    run_command(f"hdfs dfs -ls {output_path}")
+    for path in store.list(output_path):
+        print(f"  {path}")
+    if pipeline.failed:
+        print(f"❌ Failed months: {', '.join(sorted(pipeline.failed))}")
+        sys.exit(1)
+    print(f"✅ All {args.year} files processed!")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
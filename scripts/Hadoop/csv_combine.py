@@ -0,0 +1,335 @@
+# Stream CSV files into one combined CSV, one chunk at a time.
+#
+# Each input is read in chunks of --chunk-rows rows, given its constant
+# columns (file_source, filedate, ...) and written straight to the output
+# stream, which may be a local file or an HDFS upload (stores.open_write).
+# Nothing is concatenated, so memory stays at about one chunk however many
+# years are combined. Values are read and written as text, so numbers keep
+# their original form and no column changes type between chunks.
+#
+# The header is the union of the inputs' headers, read from their first
+# lines before any data: names are matched case-insensitively (Airport_fee /
+# airport_fee) and columns missing from a file are left empty, as pd.concat
+# would do. Row counts per source and the range of every constant column are
+# collected as the chunks go past.
+#
+# When every input has the same header, concat() skips parsing altogether:
+# the files are appended byte for byte with the repeated headers dropped,
+# copied in the kernel where it can (copy_file_range between local files,
+# sendfile into the HDFS upload pipe) and in 8 MB reads otherwise, so it runs
+# at disk speed. The constant columns are not written to every row; instead
+# a hidden sidecar next to the output (.<name>.sources.json) records the byte
+# range of each input and its values, and read_combined() adds them back as
+# columns while reading.
+#
+#   python csv_combine.py yellow_2024.csv yellow_2025.csv --source yellow_2024 yellow_2025 --output all.csv
+#   python csv_combine.py ../data/yellow_tripdata_2025-*.csv --output 2025.csv --concat
+import io
+import os
+import sys
+import csv
+import json
+import stat
+import time
+import errno
+import argparse
+import collections
+
+import pandas as pd
+
+from parquet_to_csv import peak_rss_mb
+from stores import LocalStore
+
+DEFAULT_CHUNK_ROWS = 100_000
+COPY_BUFFER = 8 << 20
+# Errors meaning the kernel cannot copy between these two files, so a buffered copy is used
+NO_KERNEL_COPY = {errno.EINVAL, errno.ENOSYS, errno.EXDEV, errno.ENOTSOCK, errno.EOPNOTSUPP, errno.EBADF}
+
+
+class HeaderMismatch(ValueError):
+    """The inputs of concat() do not share one header"""
+
+
+def parse_header(line):
+    return next(csv.reader([line.decode("utf-8-sig").strip("\r\n")]))
+
+
+def union_header(headers):
+    """The columns of all headers in order of first appearance, matched case-insensitively"""
+    columns = {}
+    for header in headers:
+        for name in header:
+            columns.setdefault(name.lower(), name)
+    return list(columns.values())
+
+
+class CombineStats:
+    """Rows, bytes and per-value row counts of the constant columns, updated chunk by chunk"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.rows = 0
+        self.bytes = 0
+        self.values = collections.defaultdict(collections.Counter)
+        self.sample = None
+        self.started = time.perf_counter()
+        self.seconds = 0
+
+    def add(self, chunk, extra, size):
+        self.rows += len(chunk)
+        self.bytes += size
+        for name, value in extra.items():
+            self.values[name][value] += len(chunk)
+        if self.sample is None:
+            self.sample = chunk.head()
+        self.seconds = time.perf_counter() - self.started
+
+    def distribution(self, name):
+        """(value, rows, percent) of a constant column, largest first"""
+        counts = self.values[name]
+        return [(value, rows, rows / max(self.rows, 1) * 100) for value, rows in counts.most_common()]
+
+    def value_range(self, name):
+        return min(self.values[name]), max(self.values[name])
+
+    def report(self):
+        rss = peak_rss_mb()
+        rss = "n/a" if rss is None else f"{rss:,.0f} MB"
+        return (f"{self.rows:,} rows, {self.bytes / 1e6:,.1f} MB in {self.seconds:.1f}s "
+                f"({self.rows / max(self.seconds, 1e-9):,.0f} rows/s), peak RSS {rss}")
+
+
+def combine(store, inputs, sink, chunk_rows=DEFAULT_CHUNK_ROWS, progress=print):
+    """Write the inputs to sink (a binary stream) as one CSV and return the CombineStats
+
+    inputs is a list of (path in store, {column: constant value}); the constant
+    columns go after the union of the input headers.
+    """
+    headers = [parse_header(store.head(path)) for path, _ in inputs]
+    columns = union_header(headers + [list(extra) for _, extra in inputs])
+    by_key = {column.lower(): column for column in columns}
+    stats = CombineStats(columns)
+
+    header = (",".join(columns) + "\n").encode("utf-8")
+    sink.write(header)
+    stats.bytes += len(header)
+    for (path, extra), file_header in zip(inputs, headers):
+        # Each file's own spelling of a column is written under the combined name
+        names = {name: by_key[name.lower()] for name in file_header}
+        with store.open_read(path) as f:
+            reader = pd.read_csv(f, chunksize=chunk_rows, dtype=str, keep_default_na=False,
+                                 encoding="utf-8-sig")
+            for i, chunk in enumerate(reader):
+                chunk = chunk.rename(columns=names)
+                for name, value in extra.items():
+                    chunk[by_key[name.lower()]] = value
+                text = chunk.reindex(columns=columns, fill_value="").to_csv(index=False, header=False,
+                                                                            lineterminator="\n")
+                data = text.encode("utf-8")
+                sink.write(data)
+                stats.add(chunk, extra, len(data))
+                progress(f"  {os.path.basename(path)} chunk {i + 1}: {len(chunk):,} rows")
+    return stats
+
+
+def index_path(path):
+    """The sources sidecar of a combined file: dir/name.csv -> dir/.name.csv.sources.json"""
+    folder, name = os.path.split(path)
+    return os.path.join(folder, f".{name}.sources.json")
+
+
+def _is_file(stream):
+    try:
+        return stat.S_ISREG(os.fstat(stream.fileno()).st_mode)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+
+
+def _kernel_copy(source, sink, offset):
+    """Copy a regular file from offset onto sink's fd without user-space buffers; return the bytes, or None"""
+    in_fd, out_fd = source.fileno(), sink.fileno()
+    size = os.fstat(in_fd).st_size
+    use_range = hasattr(os, "copy_file_range") and _is_file(sink)
+    if not use_range and not hasattr(os, "sendfile"):
+        return None
+    position = offset
+    while position < size:
+        try:
+            if use_range:
+                copied = os.copy_file_range(in_fd, out_fd, size - position, position)
+            else:
+                copied = os.sendfile(out_fd, in_fd, position, size - position)
+        except OSError as e:
+            # Only give up before the first byte; after that sink already holds part of the file
+            if position == offset and e.errno in NO_KERNEL_COPY:
+                return None
+            raise
+        if copied == 0:
+            break
+        position += copied
+    return position - offset
+
+
+def copy_rest(source, sink, offset):
+    """Append source from byte offset (just after its header) to sink; return (bytes, ends with a newline)"""
+    if _is_file(source):
+        sink.flush()
+        copied = _kernel_copy(source, sink, offset)
+        if copied is not None:
+            size = os.fstat(source.fileno()).st_size
+            return copied, size <= offset or os.pread(source.fileno(), 1, size - 1) == b"\n"
+        source.seek(offset)
+    copied = 0
+    last = b"\n"
+    while True:
+        block = source.read(COPY_BUFFER)
+        if not block:
+            return copied, last == b"\n"
+        sink.write(block)
+        copied += len(block)
+        last = block[-1:]
+
+
+def concat(store, inputs, sink):
+    """Append the inputs to sink (a binary stream) with one header and return the sources index
+
+    inputs is a list of (path in store, {column: constant value}), as for
+    combine(), but nothing is parsed: the values are kept in the index with the
+    byte range of each input rather than in the rows. All inputs must have the
+    same header (HeaderMismatch otherwise).
+    """
+    lines = [store.head(path) for path, _ in inputs]
+    headers = [line.removeprefix(b"\xef\xbb\xbf").rstrip(b"\r\n") for line in lines]
+    for (path, _), header in zip(inputs, headers):
+        if header and header != headers[0]:
+            raise HeaderMismatch(f"{path} has a different header from {inputs[0][0]}")
+
+    started = time.perf_counter()
+    header = headers[0] + b"\n"
+    sink.write(header)
+    position = len(header)
+    sources = []
+    for (path, extra), line in zip(inputs, lines):
+        with store.open_read(path) as f:
+            f.readline()
+            copied, newline = copy_rest(f, sink, len(line))
+            if not newline:
+                sink.write(b"\n")
+                copied += 1
+        sources.append({"path": path, "start": position, "end": position + copied, **extra})
+        position += copied
+    sink.flush()
+    return {"header": parse_header(header), "columns": list(dict.fromkeys(name for _, extra in inputs for name in extra)),
+            "bytes": position, "seconds": time.perf_counter() - started, "sources": sources}
+
+
+def write_index(store, path, index):
+    with store.open_write(index_path(path)) as f:
+        f.write(json.dumps(index, indent=2).encode("utf-8"))
+
+
+def combine_file(store, inputs, path, chunk_rows=DEFAULT_CHUNK_ROWS, progress=print):
+    """combine() the inputs into a file of the store and return the CombineStats"""
+    with store.open_write(path) as sink:
+        stats = combine(store, inputs, sink, chunk_rows, progress)
+    # The columns are in the rows now, so an index from an earlier concat() would be wrong
+    store.remove(index_path(path))
+    return stats
+
+
+def concat_file(store, inputs, path):
+    """concat() the inputs into a file of the store, write its sources index and return the index"""
+    with store.open_write(path) as sink:
+        index = concat(store, inputs, sink)
+    write_index(store, path, index)
+    return index
+
+
+def read_index(store, path):
+    """The sources index of a combined file, or None if it was not written by concat()"""
+    if not store.exists(index_path(path)):
+        return None
+    with store.open_read(index_path(path)) as f:
+        return json.loads(f.read())
+
+
+def report_index(index):
+    megabytes = index["bytes"] / 1e6
+    return (f"{len(index['sources'])} files, {megabytes:,.1f} MB in {index['seconds']:.1f}s "
+            f"({megabytes / max(index['seconds'], 1e-9):,.0f} MB/s)")
+
+
+class _Range(io.RawIOBase):
+    """The next ``size`` bytes of a stream, as a file of their own"""
+
+    def __init__(self, stream, size):
+        self.stream = stream
+        self.left = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(min(len(buffer), self.left))
+        self.left -= len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def read_combined(stream, index=None, chunk_rows=DEFAULT_CHUNK_ROWS, **read_csv_args):
+    """Yield DataFrame chunks of a combined CSV (a binary stream), adding the index's columns back"""
+    header = stream.readline()
+    if index is None:
+        yield from pd.read_csv(stream, header=None, names=parse_header(header), chunksize=chunk_rows,
+                               **read_csv_args)
+        return
+    for source in index["sources"]:
+        if source["end"] == source["start"]:
+            continue
+        part = io.BufferedReader(_Range(stream, source["end"] - source["start"]), COPY_BUFFER)
+        for chunk in pd.read_csv(part, header=None, names=index["header"], chunksize=chunk_rows, **read_csv_args):
+            for name in index["columns"]:
+                chunk[name] = source[name]
+            yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Combine CSV files into one in constant memory")
+    parser.add_argument("inputs", nargs="+", help="CSV files, combined in the order given")
+    parser.add_argument("--source", nargs="+", help="file_source value of each input (default: the file name)")
+    parser.add_argument("--output", required=True, help='combined CSV file, or "-" for stdout')
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"rows per chunk (default {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument("--concat", action="store_true",
+                        help="append the files unparsed and keep file_source in a sidecar index (same headers only)")
+    args = parser.parse_args()
+    if args.source and len(args.source) != len(args.inputs):
+        parser.error("--source needs one value per input")
+
+    sources = args.source or [os.path.splitext(os.path.basename(path))[0] for path in args.inputs]
+    store = LocalStore("/")
+    inputs = [(os.path.abspath(path), {"file_source": source}) for path, source in zip(args.inputs, sources)]
+    log = sys.stderr if args.output == "-" else sys.stdout
+    progress = lambda message: print(message, file=log)
+    if args.concat:
+        if args.output == "-":
+            parser.error("--concat needs an --output file for its index")
+        output = os.path.abspath(args.output)
+        try:
+            index = concat_file(store, inputs, output)
+        except HeaderMismatch as e:
+            sys.exit(f"❌ {e}; combine without --concat to line the columns up")
+        print(f"✅ {report_index(index)}, sources in {index_path(output)}", file=log)
+        return
+    if args.output == "-":
+        stats = combine(store, inputs, sys.stdout.buffer, args.chunk_rows, progress)
+        sys.stdout.buffer.flush()
+    else:
+        stats = combine_file(store, inputs, os.path.abspath(args.output), args.chunk_rows, progress)
+    print(f"✅ {stats.report()}", file=log)
+    for source, rows, percent in stats.distribution("file_source"):
+        print(f"   {source}: {rows:,} rows ({percent:.1f}%)", file=log)
+
+
+if __name__ == "__main__":
+    main()
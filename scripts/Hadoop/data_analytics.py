@@ -3,24 +3,38 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import os
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from trip_dataset import read_trips
+
 # Set up visualization style
 plt.style.use('ggplot')
 sns.set_palette("husl")
 plt.rcParams['figure.figsize'] = (12, 8)
 
-def load_sample_data():
-    """Load a sample of the data for visualization"""
+# Partitioned trip dataset from trip_dataset.py, and the columns the charts use
+DATASET_ROOT = "../data/trips"
+COLUMNS = ['pickup_datetime', 'passenger_count', 'trip_distance', 'payment_type', 'fare_amount', 'extra',
+           'mta_tax', 'tip_amount', 'tolls_amount', 'total_amount']
+
+def load_sample_data(year=2023, month=1):
+    """Load one month of the columns used for visualization"""
     print("Loading sample data...")
     
-    # Load one month as sample (you can change this to any month)
-    sample_file = "../data/yellow_tripdata_2023-01.parquet"
-    df = pd.read_parquet(sample_file)
-    
-    print(f"Loaded {len(df):,} rows from January 2023")
+    if os.path.isdir(DATASET_ROOT):
+        # Only the month's partition and the listed columns are read
+        df = read_trips(DATASET_ROOT, COLUMNS, taxi_type="yellow", years=year, months=month).to_pandas()
+    else:
+        # Single monthly file (you can change this to any month)
+        sample_file = f"../data/yellow_tripdata_{year}-{month:02d}.parquet"
+        columns = ['tpep_pickup_datetime'] + COLUMNS[1:]
+        df = pd.read_parquet(sample_file, columns=columns)
+        df = df.rename(columns={'tpep_pickup_datetime': 'pickup_datetime'})
+    
+    print(f"Loaded {len(df):,} rows from {datetime(year, month, 1):%B %Y}")
     return df
 
 def create_trip_distance_histogram(df):
@@ -106,7 +120,7 @@ def create_hourly_trip_bar_chart(df):
     print("Creating hourly trip bar chart...")
     
     # Extract hour from datetime
-    df['pickup_hour'] = pd.to_datetime(df['tpep_pickup_datetime']).dt.hour
+    df['pickup_hour'] = pd.to_datetime(df['pickup_datetime']).dt.hour
     
     hourly_counts = df['pickup_hour'].value_counts().sort_index()
     
@@ -1,75 +1,240 @@
-
-"""Untitled36.ipynb
-
-Automatically generated by Colab.
-
-Original file is located at
-    https://colab.research.google.com/drive/1-2rg_qZrRFOhsjpfcyBuQIA6EPQJ2wZA
-"""
-
 # scripts/download_data.py
-
-import requests # type: ignore
+#
+# Download the monthly NYC TLC trip files for one or more taxi types over a
+# range of months:
+#
+#   python download_data.py --taxi-types yellow --start 2023-01 --end 2025-12
+#   python download_data.py --taxi-types yellow green --start 2023-01 --end 2023-07 --workers 8
+#
+# Files are fetched in parallel threads and written in large chunks to
+# <name>.part, then renamed once their size matches the server's. An
+# interrupted or failed transfer is resumed from the end of its .part file
+# with an HTTP Range request and retried with backoff. Every finished file
+# is recorded in manifest.json (size, sha256, url) in the output folder, so
+# reruns skip what is already there; --verify re-checks the checksums.
+# Months the TLC has not published yet (404) are reported and skipped.
+#
+# --base-url points the downloader at any server with the same file names,
+# e.g. a local stand-in for testing:
+#
+#   python -m http.server 8000 --directory mirror &
+#   python download_data.py --base-url http://localhost:8000/ --output /tmp/data
 import os
-
-# Define the base URL and parameters
-base_url = "https://d37ci6vzurychx.cloudfront.net/trip-data/"
-file_format = "parquet"  # Use 'csv' if you prefer, but Parquet is better
-taxi_type = "green"     # You can change this to "green" or "fhv"
-
-# Create the data directory if it doesn't exist
-os.makedirs("../data", exist_ok=True)
-
-# Define the months we want: Aug 2023 to July 2024
-months = [
-    ('2023', '01'), ('2023', '02'), ('2023', '03'), ('2023', '04'), 
-    ('2023', '05'), ('2023', '06'), ('2023', '07')
-]
-
-print("Starting download of NYC Taxi data...")
-
-for year, month in months:
-    # Construct the filename, e.g., yellow_tripdata_2023-08.parquet
-    file_name = f"{taxi_type}_tripdata_{year}-{month}.{file_format}"
-    url = base_url + file_name
-    local_filepath = os.path.join("../data", file_name)
-
-    print(f"Downloading {file_name}...")
-
-    # Download the file
-    response = requests.get(url, stream=True)
-    response.raise_for_status()  # Check if the request was successful
-
-    # Save the file to the data directory
-    with open(local_filepath, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-
-    print(f"Saved to {local_filepath}")
-
-print("All downloads complete!")
-
-#pip install pandas pyarrow
-
-# import pandas as pd
-# import os
-
-# # Define paths
-# input_file = "../data/yellow_tripdata_2023-08.parquet"  # Using one month as an example
-# output_file = "../data/sample_yellow_tripdata_2023-08.csv"
-
-# print(f"Reading a sample from {input_file}...")
-
-# # Read the Parquet file. Use nrows to only read a sample of rows.
-# # Reading 10,000 rows is enough for analysis in a notebook.
-# df = pd.read_parquet(input_file) # Pandas will automatically use PyArrow
-
-# # Take a sample of 10,000 rows if the file is large
-# # If you want a specific sample size, you can use: df = df.sample(n=10000, random_state=42)
-# print(f"DataFrame shape: {df.shape}")
-
-# print(f"Saving sample to {output_file}...")
-# # Save the sampled data to a CSV file
-# df.to_csv(output_file, index=False)
-
-# print("Sample CSV created successfully!")
\ No newline at end of file
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+BASE_URL = "https://d37ci6vzurychx.cloudfront.net/trip-data/"
+TAXI_TYPES = ("yellow", "green", "fhv", "fhvhv")
+MANIFEST = "manifest.json"
+CHUNK_SIZE = 4 << 20
+RETRIES = 5
+TIMEOUT = 60
+
+
+class NotPublished(Exception):
+    """The server has no file for this month (404)"""
+
+
+def month_range(start, end):
+    """Yield (year, month) strings from start to end inclusive, both "YYYY-MM" """
+    year, month = map(int, start.split("-"))
+    last = tuple(map(int, end.split("-")))
+    while (year, month) <= last:
+        yield f"{year}", f"{month:02d}"
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def file_names(taxi_types, start, end, file_format):
+    return [f"{taxi_type}_tripdata_{year}-{month}.{file_format}"
+            for taxi_type in taxi_types for year, month in month_range(start, end)]
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """manifest.json in the output folder, saved after every finished file"""
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, MANIFEST)
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.entries = json.load(f)
+
+    def get(self, name):
+        with self.lock:
+            return self.entries.get(name)
+
+    def record(self, name, entry):
+        with self.lock:
+            self.entries[name] = entry
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(self.path + ".tmp", self.path)
+
+
+def remote_size(url, timeout):
+    """Content-Length from a HEAD request, or None if the server does not say"""
+    request = urllib.request.Request(url, method="HEAD")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            length = response.headers.get("Content-Length")
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            raise NotPublished(url) from None
+        raise
+    return int(length) if length is not None else None
+
+
+def fetch(url, part_path, timeout):
+    """Download url into part_path, resuming from its current size; return the total size"""
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            raise NotPublished(url) from None
+        if e.code == 416:
+            # The .part file already holds everything the server has
+            total = e.headers.get("Content-Range", "").rpartition("/")[2]
+            if total.isdigit() and int(total) == offset:
+                return offset
+            os.remove(part_path)
+        raise
+
+    with response:
+        if offset and response.status != 206:
+            # The server ignored the range, so start again from the beginning
+            offset = 0
+        content_range = response.headers.get("Content-Range")
+        length = response.headers.get("Content-Length")
+        if content_range and content_range.rpartition("/")[2].isdigit():
+            total = int(content_range.rpartition("/")[2])
+        else:
+            total = offset + int(length) if length is not None else None
+
+        with open(part_path, "ab" if offset else "wb") as f:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+            size = f.tell()
+
+    if total is not None and size != total:
+        raise IOError(f"incomplete download: {size:,} of {total:,} bytes")
+    return size
+
+
+def download(name, args, manifest):
+    """Fetch one file unless it is already complete; return (status, bytes fetched)"""
+    url = args.base_url + name
+    path = os.path.join(args.output, name)
+    part_path = path + ".part"
+
+    entry = manifest.get(name)
+    if entry and os.path.exists(path) and os.path.getsize(path) == entry["size"]:
+        if not args.verify or file_checksum(path) == entry["sha256"]:
+            return "skipped", 0
+        print(f"⚠️ Checksum mismatch, downloading again: {name}")
+        os.remove(path)
+    elif os.path.exists(path):
+        # Present but not in the manifest (an older download): keep it if its size is right
+        expected = remote_size(url, args.timeout)
+        if expected is not None and os.path.getsize(path) == expected:
+            manifest.record(name, {"size": expected, "sha256": file_checksum(path), "url": url})
+            return "skipped", 0
+        # A shorter file is resumed like any partial download
+        os.replace(path, part_path)
+
+    start_size = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    for attempt in range(1, args.retries + 1):
+        try:
+            size = fetch(url, part_path, args.timeout)
+            break
+        except NotPublished:
+            raise
+        except (urllib.error.URLError, OSError) as e:
+            if attempt == args.retries:
+                raise
+            delay = min(2 ** attempt, 30)
+            print(f"⚠️ {name}: {e}; retrying in {delay}s ({attempt}/{args.retries - 1})")
+            time.sleep(delay)
+
+    os.replace(part_path, path)
+    manifest.record(name, {"size": size, "sha256": file_checksum(path), "url": url})
+    return "downloaded", size - start_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download NYC TLC monthly trip files in parallel")
+    parser.add_argument("--taxi-types", nargs="+", choices=TAXI_TYPES, default=["yellow"])
+    parser.add_argument("--start", default="2023-01", help="first month, YYYY-MM (default 2023-01)")
+    parser.add_argument("--end", default="2025-12", help="last month, YYYY-MM (default 2025-12)")
+    parser.add_argument("--format", default="parquet", help="file extension on the server (default parquet)")
+    parser.add_argument("--output", default="../data", help="download folder (default ../data)")
+    parser.add_argument("--base-url", default=BASE_URL, help=f"server folder (default {BASE_URL})")
+    parser.add_argument("--workers", type=int, default=6, help="parallel downloads")
+    parser.add_argument("--retries", type=int, default=RETRIES, help="attempts per file")
+    parser.add_argument("--timeout", type=int, default=TIMEOUT, help="socket timeout in seconds")
+    parser.add_argument("--verify", action="store_true", help="re-check the sha256 of files already present")
+    args = parser.parse_args()
+    if not args.base_url.endswith("/"):
+        args.base_url += "/"
+
+    os.makedirs(args.output, exist_ok=True)
+    manifest = Manifest(args.output)
+    names = file_names(args.taxi_types, args.start, args.end, args.format)
+    print(f"Starting download of {len(names)} NYC Taxi files with {args.workers} workers...")
+
+    started = time.perf_counter()
+    fetched = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(download, name, args, manifest): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                status, size = future.result()
+            except NotPublished:
+                print(f"⚠️ Not published: {name}")
+                continue
+            except Exception as e:
+                print(f"❌ {name}: {e}")
+                failed.append(name)
+                continue
+            fetched += size
+            if status == "skipped":
+                print(f"Already present: {name}")
+            else:
+                print(f"Saved {name} ({size / 1e6:,.1f} MB)")
+
+    elapsed = time.perf_counter() - started
+    print(f"Fetched {fetched / 1e6:,.1f} MB in {elapsed:.1f}s ({fetched / 1e6 / max(elapsed, 1e-9):,.1f} MB/s)")
+    if failed:
+        print(f"❌ {len(failed)} file(s) failed; rerun to resume them: {', '.join(sorted(failed))}")
+        sys.exit(1)
+    print("All downloads complete!")
+
+
+if __name__ == "__main__":
+    main()
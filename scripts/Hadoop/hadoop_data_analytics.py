@@ -1,4 +1,5 @@
 # visualize_combined_2023.py
+import json
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -7,6 +8,8 @@ from hdfs import InsecureClient
 import warnings
 warnings.filterwarnings('ignore')
 
+from csv_combine import index_path, read_combined
+
 # Set up HDFS client
 client = InsecureClient('http://localhost:9870', user='MukondeleliNegukhula')
 
@@ -14,10 +17,22 @@ def read_csv_from_hdfs(hdfs_path, sample_size=10000000):
     """Read CSV file directly from HDFS with sampling"""
     print(f"Reading data from HDFS: {hdfs_path}")
     
+    # A file combined with --concat keeps filedate in its sources index rather than in the rows
+    index = None
+    if client.status(index_path(hdfs_path), strict=False) is not None:
+        with client.read(index_path(hdfs_path)) as reader:
+            index = json.load(reader)
+    
     with client.read(hdfs_path) as reader:
-        # Read in chunks for large files
-        chunk_iter = pd.read_csv(reader, chunksize=sample_size, iterator=True)
-        df = next(chunk_iter)  # Get first chunk
+        # Read in chunks for large files, up to sample_size rows
+        chunks = []
+        rows = 0
+        for chunk in read_combined(reader, index, chunk_rows=min(sample_size, 1000000)):
+            chunks.append(chunk.head(sample_size - rows))
+            rows += len(chunks[-1])
+            if rows >= sample_size:
+                break
+        df = pd.concat(chunks, ignore_index=True)
     
     print(f"✅ Loaded {len(df):,} sample rows from combined 2023 data")
     return df
@@ -0,0 +1,158 @@
+# Stream Parquet trip files into one CSV, one record batch at a time.
+#
+# Each file is read with pyarrow's iter_batches (decoded on Arrow's thread
+# pool, one batch ahead of the writer) and written with Arrow's CSV writer,
+# so memory stays at about one batch (never more than a row group) however
+# large the month is, instead of a whole DataFrame plus its CSV text.
+#
+# When several files are combined their columns are unified first, from the
+# Parquet footers only: names are matched case-insensitively (Airport_fee /
+# airport_fee), columns missing from a file are left empty, and differing
+# numeric types are widened (int64 -> double), as pd.concat would do.
+# Timestamps are written to the second ("2025-01-01 00:18:38"), numbers in
+# their shortest form ("1" rather than "1.0") and text in double quotes, so
+# values holding commas or quotes stay valid CSV.
+#
+# The output is therefore not byte-for-byte the CSV that pandas' to_csv
+# wrote before: whole floats lose their ".0" (passenger_count "1", not "1.0")
+# and every text value is quoted (store_and_fwd_flag "N", not N). The
+# values are the same, and the mappers read both forms: they convert
+# numbers with float() and never read the quoted text columns.
+#
+#   python parquet_to_csv.py yellow_tripdata_2025-01.parquet --output yellow_tripdata_2025-01.csv
+#   python parquet_to_csv.py ../data/*.parquet --output - | hdfs dfs -put - /MIT805A1/combined.csv
+import sys
+import time
+import queue
+import argparse
+import threading
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+DEFAULT_BATCH_ROWS = 128 * 1024
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (ru_maxrss is KB on Linux), None on Windows"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def widen(current, other):
+    """A type that holds the values of both column types"""
+    if current == other:
+        return current
+    if pa.types.is_integer(current) and pa.types.is_integer(other):
+        return pa.int64()
+    if (pa.types.is_integer(current) or pa.types.is_floating(current)) and \
+            (pa.types.is_integer(other) or pa.types.is_floating(other)):
+        return pa.float64()
+    if pa.types.is_timestamp(current) and pa.types.is_timestamp(other):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def unified_schema(paths):
+    """The union of the files' columns in order of first appearance, as written to the CSV"""
+    fields = {}
+    for path in paths:
+        for field in pq.read_schema(path):
+            key = field.name.lower()
+            if key in fields:
+                fields[key] = fields[key].with_type(widen(fields[key].type, field.type))
+            else:
+                fields[key] = field
+    # Whole seconds, as in the TLC data and pandas' CSV output
+    return pa.schema([field.with_type(pa.timestamp("s")) if pa.types.is_timestamp(field.type) else field
+                      for field in fields.values()])
+
+
+def align(batch, schema):
+    """Reorder, fill and cast a batch's columns to the output schema"""
+    columns = {name.lower(): column for name, column in zip(batch.schema.names, batch.columns)}
+    arrays = []
+    for field in schema:
+        column = columns.get(field.name.lower())
+        if column is None:
+            arrays.append(pa.nulls(batch.num_rows, field.type))
+        elif column.type == field.type:
+            arrays.append(column)
+        else:
+            arrays.append(column.cast(field.type, safe=False))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def read_ahead(paths, batch_rows):
+    """Yield the record batches of every file, decoding the next one in a background thread"""
+    batches = queue.Queue(maxsize=1)
+    done = object()
+
+    def produce():
+        try:
+            for path in paths:
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+                    batches.put(batch)
+            batches.put(done)
+        except BaseException as e:
+            batches.put(e)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = batches.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def convert(paths, output, batch_rows=DEFAULT_BATCH_ROWS):
+    """Write the Parquet files to one CSV (a path or "-" for stdout) and return the stats"""
+    schema = unified_schema(paths)
+    sink = sys.stdout.buffer if output == "-" else open(output, "wb")
+    # Arrow quotes the header names, so the plain header line is written here
+    options = pacsv.WriteOptions(include_header=False, quoting_style="needed")
+    started = time.perf_counter()
+    rows = 0
+    try:
+        sink.write((",".join(schema.names) + "\n").encode("utf-8"))
+        with pacsv.CSVWriter(sink, schema, write_options=options) as writer:
+            for batch in read_ahead(paths, batch_rows):
+                writer.write_batch(align(batch, schema))
+                rows += batch.num_rows
+    finally:
+        if sink is not sys.stdout.buffer:
+            sink.close()
+        else:
+            sink.flush()
+    elapsed = time.perf_counter() - started
+    return {"rows": rows, "seconds": elapsed, "rows_per_s": rows / max(elapsed, 1e-9),
+            "peak_rss_mb": peak_rss_mb()}
+
+
+def report(stats):
+    rss = "n/a" if stats["peak_rss_mb"] is None else f"{stats['peak_rss_mb']:,.0f} MB"
+    return f"{stats['rows']:,} rows in {stats['seconds']:.1f}s ({stats['rows_per_s']:,.0f} rows/s), peak RSS {rss}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert Parquet trip files to one CSV in bounded memory")
+    parser.add_argument("inputs", nargs="+", help="Parquet files, combined in the order given")
+    parser.add_argument("--output", required=True, help='CSV file, or "-" for stdout')
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS,
+                        help=f"rows per record batch (default {DEFAULT_BATCH_ROWS})")
+    args = parser.parse_args()
+
+    stats = convert(args.inputs, args.output, args.batch_rows)
+    print(f"✅ {report(stats)}", file=sys.stderr if args.output == "-" else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,39 @@
 # dataset_statistics.py
+#
+# Reads the partitioned Parquet trip dataset (see trip_dataset.py) by default;
+# --taxi-type/--year/--month prune to those partition folders and --columns
+# reads only those columns. --csv reads the old combined CSV instead.
+#
+#   spark-submit statistics.py --taxi-type yellow --year 2024 --columns fare_amount total_amount
+import argparse
+
 from pyspark.sql import SparkSession
 from pyspark.sql.functions import col, count, when, lit
 from pyspark.sql.types import StructType, StructField, StringType, LongType, DoubleType
 import humanize
 
-def generate_dataset_statistics():
-    """Generate comprehensive dataset statistics for the combined taxi data"""
+DATASET_PATH = "hdfs://localhost:9870/MIT805A1/trips"
+CSV_PATH = "hdfs://localhost:9870/MIT805A1/combined_all_taxi_data/nyc_all_taxi_data_2023_2024_combined.csv"
+
+def read_trips(spark, args):
+    """The trips to describe: the pruned, projected dataset, or the combined CSV with --csv"""
+    if args.csv:
+        return spark.read.csv(args.csv, header=True, inferSchema=True)
+    
+    df = spark.read.parquet(args.input)
+    # Filters on the partition columns only list the matching folders
+    if args.taxi_type:
+        df = df.filter(col("taxi_type") == args.taxi_type)
+    if args.year:
+        df = df.filter(col("year").isin(args.year))
+    if args.month:
+        df = df.filter(col("month").isin(args.month))
+    if args.columns:
+        df = df.select(*args.columns)
+    return df
+
+def generate_dataset_statistics(args):
+    """Generate comprehensive dataset statistics for the taxi data"""
     
     # Initialize Spark session
     spark = SparkSession.builder \
@@ -13,15 +41,8 @@ def generate_dataset_statistics():
         .config("spark.sql.adaptive.enabled", "true") \
         .getOrCreate()
     
-    # Read the combined data
-    input_path = "hdfs://localhost:9870/MIT805A1/combined_all_taxi_data/nyc_all_taxi_data_2023_2024_combined.csv"
-    
-    print("Reading combined data...")
-    df = spark.read.csv(
-        input_path,
-        header=True,
-        inferSchema=True
-    )
+    print(f"Reading {args.csv or args.input}...")
+    df = read_trips(spark, args)
     
     # Calculate statistics
     print("Calculating statistics...")
@@ -31,7 +52,10 @@ def generate_dataset_statistics():
     num_observations = df.count()
     
     # Missing values calculation
-    missing_expr = [count(when(col(c).isNull() | (col(c) == ""), c)).alias(c) for c in df.columns]
+    # Typed Parquet columns cannot hold "", so only CSV text columns are compared to it
+    text_columns = {f.name for f in df.schema.fields if isinstance(f.dataType, StringType)}
+    missing_expr = [count(when(col(c).isNull() | (col(c) == "") if c in text_columns else col(c).isNull(), c)).alias(c)
+                    for c in df.columns]
     missing_counts = df.select(missing_expr).collect()[0]
     missing_cells = sum([missing_counts[c] for c in df.columns])
     missing_percentage = (missing_cells / (num_variables * num_observations)) * 100
@@ -112,4 +136,11 @@ def generate_dataset_statistics():
     spark.stop()
 
 if __name__ == "__main__":
-    generate_dataset_statistics()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Dataset statistics for the taxi data")
+    parser.add_argument("--input", default=DATASET_PATH, help=f"partitioned Parquet dataset (default {DATASET_PATH})")
+    parser.add_argument("--taxi-type", help="only this taxi type")
+    parser.add_argument("--year", type=int, nargs="+", help="only these years")
+    parser.add_argument("--month", type=int, nargs="+", help="only these months")
+    parser.add_argument("--columns", nargs="+", help="only these columns (default all)")
+    parser.add_argument("--csv", nargs="?", const=CSV_PATH, help=f"read a combined CSV instead (default {CSV_PATH})")
+    generate_dataset_statistics(parser.parse_args())
\ No newline at end of file
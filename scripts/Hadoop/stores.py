@@ -0,0 +1,159 @@
+# File stores for the ingest scripts: HDFS through the "hdfs dfs" command
+# line, or a local folder standing in for it when testing without a cluster.
+#
+# Both take the same absolute HDFS-style paths, so a script switches between
+# them without changing its paths:
+#
+#   store = LocalStore("/tmp/fake_hdfs") if args.local_store else HdfsStore()
+#   store.get("/user/MukondeleliNegukhula/nyc_taxi/raw/yellow_tripdata_2025-01.parquet", "month.parquet")
+#
+# open_read and open_write stream a file without a local copy:
+#
+#   with store.open_write("/MIT805A1/combined.csv") as f:
+#       f.write(b"...")
+import os
+import shutil
+import contextlib
+import subprocess
+
+
+class StoreError(Exception):
+    """A store command failed"""
+
+
+class HdfsStore:
+    """HDFS paths handled with the hdfs dfs command line"""
+
+    def __init__(self, command="hdfs"):
+        self.command = command
+
+    def _run(self, *args, check=True):
+        result = subprocess.run([self.command, "dfs", *args], capture_output=True, text=True)
+        if check and result.returncode != 0:
+            raise StoreError(f"{self.command} dfs {' '.join(args)} failed: {result.stderr.strip()}")
+        return result
+
+    def exists(self, path):
+        return self._run("-test", "-e", path, check=False).returncode == 0
+
+    def mkdir(self, path):
+        self._run("-mkdir", "-p", path)
+
+    def get(self, path, local_path):
+        self._run("-get", "-f", path, local_path)
+
+    def put(self, local_path, path):
+        self._run("-put", "-f", local_path, path)
+
+    def remove(self, path):
+        """Delete a file; a missing one is not an error"""
+        self._run("-rm", "-f", "-skipTrash", path)
+
+    def list(self, path):
+        return [line.split()[-1] for line in self._run("-ls", "-C", path).stdout.splitlines() if line.strip()]
+
+    def head(self, path):
+        """The first line of a file, as bytes"""
+        process = subprocess.Popen([self.command, "dfs", "-cat", path], stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL)
+        line = process.stdout.readline()
+        process.kill()
+        process.wait()
+        process.stdout.close()
+        return line
+
+    @contextlib.contextmanager
+    def open_read(self, path):
+        """A binary stream of the file's contents (hdfs dfs -cat)"""
+        process = subprocess.Popen([self.command, "dfs", "-cat", path], stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        try:
+            yield process.stdout
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            process.wait()
+        if process.returncode != 0:
+            raise StoreError(f"{self.command} dfs -cat {path} failed: {stderr.decode(errors='replace').strip()}")
+
+    @contextlib.contextmanager
+    def open_write(self, path):
+        """A binary stream into the file (hdfs dfs -put from stdin); it appears when the block exits cleanly"""
+        process = subprocess.Popen([self.command, "dfs", "-put", "-f", "-", path], stdin=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        try:
+            yield process.stdin
+        except BaseException:
+            # Killed before the upload finishes, so hdfs never renames its _COPYING_ file into place
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            if not process.stdin.closed:
+                process.stdin.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        if process.wait() != 0:
+            raise StoreError(f"{self.command} dfs -put - {path} failed: {stderr.decode(errors='replace').strip()}")
+
+
+class LocalStore:
+    """A local folder standing in for HDFS: /a/b is stored as <root>/a/b"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def local(self, path):
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def exists(self, path):
+        return os.path.exists(self.local(path))
+
+    def mkdir(self, path):
+        os.makedirs(self.local(path), exist_ok=True)
+
+    def get(self, path, local_path):
+        try:
+            shutil.copyfile(self.local(path), local_path)
+        except OSError as e:
+            raise StoreError(f"get {path} failed: {e}") from e
+
+    def put(self, local_path, path):
+        target = self.local(path)
+        if path.endswith("/") or os.path.isdir(target):
+            target = os.path.join(target, os.path.basename(local_path))
+        try:
+            shutil.copyfile(local_path, target)
+        except OSError as e:
+            raise StoreError(f"put {path} failed: {e}") from e
+
+    def remove(self, path):
+        if os.path.exists(self.local(path)):
+            os.remove(self.local(path))
+
+    def list(self, path):
+        folder = self.local(path)
+        return [os.path.join(path, name) for name in sorted(os.listdir(folder))]
+
+    def head(self, path):
+        with open(self.local(path), "rb") as f:
+            return f.readline()
+
+    def open_read(self, path):
+        return open(self.local(path), "rb")
+
+    @contextlib.contextmanager
+    def open_write(self, path):
+        target = self.local(path)
+        tmp = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                yield f
+        except BaseException:
+            os.remove(tmp)
+            raise
+        os.replace(tmp, target)
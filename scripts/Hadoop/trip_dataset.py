@@ -0,0 +1,246 @@
+# Hive-partitioned Parquet dataset of every trip, the canonical store the
+# analytics scripts read instead of the giant combined CSVs.
+#
+#   <root>/taxi_type=yellow/year=2025/month=1/part-0.parquet
+#
+# ingest converts monthly TLC files (Parquet or CSV, named like
+# yellow_tripdata_2025-01.parquet) into the dataset one record batch at a
+# time. Every file is cast to one explicit schema (TRIP_SCHEMA), so yellow
+# and green trips share column names (pickup_datetime rather than
+# tpep_/lpep_pickup_datetime, airport_fee in any spelling) and types no
+# longer drift between months. A month's partition is replaced as a whole,
+# so re-ingesting a file is safe. The partition is the month of the source
+# file; stray pickup dates inside a file stay in its partition.
+#
+#   python trip_dataset.py ingest ../data/yellow_tripdata_*.parquet --root ../data/trips
+#   python trip_dataset.py scan --root ../data/trips --year 2025 --month 1 --columns total_amount
+#
+# Readers call read_trips() with partition filters and a column list; only
+# the matching month folders are opened and only the listed column chunks
+# are read, so a one-month or one-column question reads megabytes instead
+# of the whole history. Spark reads the same folders with
+# spark.read.parquet(root) and prunes on taxi_type/year/month.
+import os
+import re
+import csv
+import sys
+import time
+import argparse
+import datetime
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+TRIP_SCHEMA = pa.schema([
+    ("VendorID", pa.int32()),
+    ("pickup_datetime", pa.timestamp("us")),
+    ("dropoff_datetime", pa.timestamp("us")),
+    ("passenger_count", pa.int32()),
+    ("trip_distance", pa.float64()),
+    ("RatecodeID", pa.int32()),
+    ("store_and_fwd_flag", pa.string()),
+    ("PULocationID", pa.int32()),
+    ("DOLocationID", pa.int32()),
+    ("payment_type", pa.int32()),
+    ("fare_amount", pa.float64()),
+    ("extra", pa.float64()),
+    ("mta_tax", pa.float64()),
+    ("tip_amount", pa.float64()),
+    ("tolls_amount", pa.float64()),
+    ("ehail_fee", pa.float64()),
+    ("improvement_surcharge", pa.float64()),
+    ("total_amount", pa.float64()),
+    ("trip_type", pa.int32()),
+    ("congestion_surcharge", pa.float64()),
+    ("airport_fee", pa.float64()),
+    ("cbd_congestion_fee", pa.float64()),
+])
+PARTITION_SCHEMA = pa.schema([("taxi_type", pa.string()), ("year", pa.int16()), ("month", pa.int8())])
+
+# Source column names (lower case) that map onto a differently named dataset column
+ALIASES = {
+    "tpep_pickup_datetime": "pickup_datetime", "lpep_pickup_datetime": "pickup_datetime",
+    "tpep_dropoff_datetime": "dropoff_datetime", "lpep_dropoff_datetime": "dropoff_datetime",
+}
+FILE_NAME = re.compile(r"(yellow|green|fhv|fhvhv)_tripdata_(\d{4})-(\d{2})")
+ROW_GROUP_ROWS = 512 * 1024
+
+
+def partition_of(path):
+    """(taxi_type, year, month) from a TLC file name"""
+    match = FILE_NAME.search(os.path.basename(path))
+    if not match:
+        raise ValueError(f"cannot tell the taxi type and month of {path}")
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
+
+def partition_dir(root, taxi_type, year, month):
+    return os.path.join(root, f"taxi_type={taxi_type}", f"year={year}", f"month={month}")
+
+
+def _parse(text, type):
+    if pa.types.is_timestamp(type):
+        return datetime.datetime.fromisoformat(text)
+    if pa.types.is_integer(type):
+        return int(float(text))
+    if pa.types.is_floating(type):
+        return float(text)
+    return text
+
+
+def cast_column(column, type):
+    """Cast a column, turning values that do not parse (CSV text such as "abc") into nulls"""
+    try:
+        return column.cast(type, safe=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        if not pa.types.is_string(column.type):
+            raise
+    values = []
+    for text in column.to_pylist():
+        try:
+            values.append(None if text is None else _parse(text, type))
+        except (ValueError, OverflowError):
+            values.append(None)
+    return pa.array(values, type, safe=False)
+
+
+def conform(batch):
+    """Rename, cast and fill a source batch to TRIP_SCHEMA"""
+    columns = {}
+    for name, column in zip(batch.schema.names, batch.columns):
+        key = name.lower()
+        columns[ALIASES.get(key, key)] = column
+    arrays = []
+    for field in TRIP_SCHEMA:
+        column = columns.get(field.name.lower())
+        if column is None:
+            arrays.append(pa.nulls(batch.num_rows, field.type))
+        elif column.type == field.type:
+            arrays.append(column)
+        else:
+            # Unsafe casts drop stray fractions (passenger_count 1.0 -> 1)
+            arrays.append(cast_column(column, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=TRIP_SCHEMA)
+
+
+def source_batches(path):
+    """Record batches of a monthly Parquet or CSV file"""
+    if path.endswith(".parquet"):
+        yield from pq.ParquetFile(path).iter_batches(batch_size=128 * 1024)
+        return
+    with open(path, encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    # Everything is read as text and cast by conform(), so a bad value only nulls
+    # its own cell; rows with the wrong number of fields are skipped
+    options = pacsv.ConvertOptions(column_types={name: pa.string() for name in header}, strings_can_be_null=True)
+    parse = pacsv.ParseOptions(invalid_row_handler=lambda row: "skip")
+    with pacsv.open_csv(path, parse_options=parse, convert_options=options) as reader:
+        yield from reader
+
+
+def ingest_file(path, root):
+    """Write one monthly file as its dataset partition, replacing what was there; return the rows"""
+    taxi_type, year, month = partition_of(path)
+    folder = partition_dir(root, taxi_type, year, month)
+    os.makedirs(folder, exist_ok=True)
+    # Files starting with "." are ignored by dataset readers until the rename
+    tmp = os.path.join(folder, ".part-0.parquet.tmp")
+    rows = 0
+    pending = []
+    pending_rows = 0
+    with pq.ParquetWriter(tmp, TRIP_SCHEMA, compression="zstd") as writer:
+        for batch in source_batches(path):
+            pending.append(conform(batch))
+            pending_rows += batch.num_rows
+            if pending_rows >= ROW_GROUP_ROWS:
+                writer.write_table(pa.Table.from_batches(pending), row_group_size=ROW_GROUP_ROWS)
+                rows += pending_rows
+                pending, pending_rows = [], 0
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending), row_group_size=ROW_GROUP_ROWS)
+            rows += pending_rows
+    for name in os.listdir(folder):
+        if not name.startswith("."):
+            os.remove(os.path.join(folder, name))
+    os.replace(tmp, os.path.join(folder, "part-0.parquet"))
+    return rows
+
+
+def open_dataset(root):
+    return ds.dataset(root, schema=pa.unify_schemas([TRIP_SCHEMA, PARTITION_SCHEMA]), format="parquet",
+                      partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"))
+
+
+def partition_filter(taxi_type=None, years=None, months=None):
+    """Dataset filter on the partition columns; None keeps everything"""
+    expression = None
+    for name, values in (("taxi_type", taxi_type), ("year", years), ("month", months)):
+        if values is None:
+            continue
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        condition = ds.field(name).isin(list(values))
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_trips(root, columns=None, taxi_type=None, years=None, months=None, filter=None):
+    """Read the trips of the matching partitions as an Arrow table, with only ``columns``"""
+    expression = partition_filter(taxi_type, years, months)
+    if filter is not None:
+        expression = filter if expression is None else expression & filter
+    return open_dataset(root).to_table(columns=columns, filter=expression)
+
+
+def scanned_bytes(dataset, expression, columns):
+    """Compressed bytes of the column chunks a scan reads, from the Parquet footers"""
+    total = 0
+    wanted = set(columns) if columns else None
+    for fragment in dataset.get_fragments(filter=expression):
+        metadata = fragment.metadata
+        for i in range(metadata.num_row_groups):
+            group = metadata.row_group(i)
+            for j in range(group.num_columns):
+                chunk = group.column(j)
+                if wanted is None or chunk.path_in_schema in wanted:
+                    total += chunk.total_compressed_size
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the partitioned Parquet trip dataset")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="add monthly TLC files to the dataset")
+    ingest.add_argument("inputs", nargs="+", help="monthly Parquet or CSV files (yellow_tripdata_2025-01.parquet)")
+    ingest.add_argument("--root", required=True, help="dataset folder")
+    scan = commands.add_parser("scan", help="read part of the dataset and report what was read")
+    scan.add_argument("--root", required=True, help="dataset folder")
+    scan.add_argument("--taxi-type")
+    scan.add_argument("--year", type=int, nargs="+")
+    scan.add_argument("--month", type=int, nargs="+")
+    scan.add_argument("--columns", nargs="+", help="columns to read (default all)")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        for path in args.inputs:
+            started = time.perf_counter()
+            rows = ingest_file(path, args.root)
+            print(f"✅ {os.path.basename(path)}: {rows:,} rows -> "
+                  f"{partition_dir(args.root, *partition_of(path))} in {time.perf_counter() - started:.1f}s")
+        return
+
+    dataset = open_dataset(args.root)
+    expression = partition_filter(args.taxi_type, args.year, args.month)
+    files = len(list(dataset.get_fragments(filter=expression)))
+    started = time.perf_counter()
+    table = dataset.to_table(columns=args.columns, filter=expression)
+    elapsed = time.perf_counter() - started
+    print(f"{table.num_rows:,} rows x {table.num_columns} columns from {files} file(s), "
+          f"{scanned_bytes(dataset, expression, args.columns) / 1e6:,.1f} MB of column chunks, {elapsed:.2f}s")
+    if table.num_rows == 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Mapper and reducer aggregation shared by the streaming scripts.
+
+Mappers call ``emit(key, value)`` for every record. Without --combine each
+call prints one "key\\tvalue" line as before. With --combine the values are
+summed per key in a dict (numbers, or tuples summed element-wise) and the
+partial sums are written when more than --max-keys keys are held and at end
+of input. The partials use the same "key\\tvalue" text, so the reducers
+accept them unchanged.
+
+Reducers describe their values with a Reducer subclass and call
+run_reducer(). By default they expect input sorted on the key, as Hadoop
+delivers it. With --hash they sum into a dict and emit once at the end, so
+unsorted input (cat | mapper | reducer) gives one line per key; past
+--max-keys keys the sums are spilled to sorted run files and merged at the
+end. With --combiner the values are written in the mapper's format, so the
+same script can run as a Hadoop -combiner:
+
+    -combiner "reducer_trips_per_day.py --hash --combiner"
+
+Both sides report job counters (rows read and skipped, records written,
+parse and emit time) through counters.py when they finish.
+
+With --binary on both sides the intermediate records are typedbytes
+instead of text (see typedbytes.py); the reducer output stays text.
+typedbytes.py is only imported with --binary, so only binary jobs need to
+ship it with -files.
+"""
+import os
+import sys
+import time
+import heapq
+import argparse
+import tempfile
+from operator import itemgetter
+
+from counters import Counters
+
+DEFAULT_MAX_KEYS = 100000
+DEFAULT_REDUCER_MAX_KEYS = 1000000
+# Records joined into one stdout write
+WRITE_BATCH = 4096
+
+
+class Aggregator:
+    """Per-key partial sums that are written out once the key budget is exceeded"""
+
+    def __init__(self, write, max_keys=DEFAULT_MAX_KEYS):
+        self.write = write
+        self.max_keys = max_keys
+        self.partials = {}
+
+    def add(self, key, value):
+        partials = self.partials
+        total = partials.get(key)
+        if total is None:
+            partials[key] = list(value) if isinstance(value, tuple) else value
+            if len(partials) > self.max_keys:
+                self.flush()
+        elif type(total) is list:
+            for i, v in enumerate(value):
+                total[i] += v
+        else:
+            partials[key] = total + value
+
+    def flush(self):
+        write = self.write
+        for key, total in self.partials.items():
+            write(key, total)
+        self.partials = {}
+
+
+class MapperOutput:
+    """Emit mapper records directly or through an Aggregator.
+
+    ``counters`` collects the records written and the time spent writing
+    them ("Emit"); they are reported by close(). With ``binary`` the records
+    are written as typedbytes to the binary stream.
+    """
+
+    def __init__(self, combine=False, max_keys=DEFAULT_MAX_KEYS, stream=None, counters=None, binary=False):
+        self.binary = binary
+        self.stream = stream or (sys.stdout.buffer if binary else sys.stdout)
+        self.counters = counters or Counters()
+        self.buffer = []
+        self.records = 0
+        self.emit_seconds = 0.0
+        if binary:
+            from typedbytes import encode, encode_key
+            self.encode, self.encode_key = encode, encode_key
+        write = self.write_binary if binary else self.write
+        self.aggregator = Aggregator(write, max_keys) if combine else None
+        self.emit = self.aggregator.add if combine else write
+
+    def write(self, key, value):
+        if type(value) is tuple or type(value) is list:
+            value = ",".join(map(str, value))
+        buffer = self.buffer
+        buffer.append(f"{key}\t{value}\n")
+        if len(buffer) >= WRITE_BATCH:
+            self._write_buffer()
+
+    def write_binary(self, key, value):
+        buffer = self.buffer
+        buffer.append(self.encode_key(key) + self.encode(value))
+        if len(buffer) >= WRITE_BATCH:
+            self._write_buffer()
+
+    def _write_buffer(self):
+        started = time.perf_counter()
+        self.stream.write((b"" if self.binary else "").join(self.buffer))
+        self.emit_seconds += time.perf_counter() - started
+        self.records += len(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        if self.aggregator:
+            # The final flush formats every partial sum; count all of it as emit time
+            started = time.perf_counter()
+            emitted = self.emit_seconds
+            self.aggregator.flush()
+            self.emit_seconds = emitted + time.perf_counter() - started
+        self._write_buffer()
+        self.stream.flush()
+        counters = self.counters
+        counters.incr("Records written", self.records)
+        counters.add_time("Emit", self.emit_seconds)
+        counters.report()
+
+
+def add_mapper_arguments(parser):
+    parser.add_argument("--combine", action="store_true",
+                        help="sum values per key in the mapper before emitting them")
+    parser.add_argument("--max-keys", type=int, default=DEFAULT_MAX_KEYS,
+                        help=f"keys held before partial sums are flushed (default {DEFAULT_MAX_KEYS})")
+    parser.add_argument("--binary", action="store_true", help="write typedbytes records instead of text")
+
+
+def mapper_output(description=None):
+    """Build a MapperOutput from the mapper's command line flags"""
+    parser = argparse.ArgumentParser(description=description)
+    add_mapper_arguments(parser)
+    args = parser.parse_args()
+    return MapperOutput(args.combine, args.max_keys, binary=args.binary)
+
+
+class Reducer:
+    """Sum integer "key\\tvalue" records; subclasses override the value handling"""
+
+    # Tab-separated fields that make up the key
+    key_fields = 1
+
+    def parse(self, key, text):
+        return int(text)
+
+    def merge(self, total, value):
+        return total + value
+
+    def format(self, key, total):
+        """Text of a final result"""
+        return str(total)
+
+    def format_partial(self, key, total):
+        """Text of a partial result, in the same format the mapper emits"""
+        return self.format(key, total)
+
+    def parse_value(self, key, value):
+        """Value of a decoded --binary record; text values go through parse()"""
+        if type(value) is str:
+            return self.parse(key, value)
+        return value
+
+    def partial_value(self, key, total):
+        """Partial result for --binary output: numbers and lists as they are"""
+        if isinstance(total, (int, float, list)):
+            return total
+        return self.format_partial(key, total)
+
+
+def read_records(reducer, stream, counters=None):
+    """Yield (key, value) for each well-formed input line"""
+    key_fields = reducer.key_fields
+    parse = reducer.parse
+    lines = 0
+    try:
+        for line in stream:
+            lines += 1
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            fields = line.split('\t', key_fields)
+            if len(fields) <= key_fields:
+                if counters:
+                    counters.skip("missing value")
+                continue
+            key = fields[0] if key_fields == 1 else '\t'.join(fields[:key_fields])
+            try:
+                value = parse(key, fields[key_fields])
+            except (ValueError, KeyError):
+                if counters:
+                    counters.skip("bad value")
+                continue
+            yield key, value
+    finally:
+        if counters:
+            counters.incr("Lines read", lines)
+
+
+def read_binary_records(reducer, stream, counters=None):
+    """Yield (key, value) for each typedbytes record"""
+    from typedbytes import decode_key, read_pairs
+
+    parse_value = reducer.parse_value
+    keys = {}
+    records = 0
+    try:
+        for key, value in read_pairs(stream):
+            records += 1
+            # Keys repeat, so each distinct key (as bytes) is decoded once
+            text = keys.get(key)
+            if text is None:
+                if len(keys) >= DEFAULT_MAX_KEYS:
+                    keys.clear()
+                text = keys[key] = decode_key(key)
+            try:
+                value = parse_value(text, value)
+            except (ValueError, KeyError, TypeError, IndexError):
+                if counters:
+                    counters.skip("bad value")
+                continue
+            yield text, value
+    finally:
+        if counters:
+            counters.incr("Records read", records)
+
+
+def reduce_sorted(reducer, records):
+    """Merge runs of equal keys in key-sorted records"""
+    merge = reducer.merge
+    current_key = None
+    current_total = None
+    for key, value in records:
+        if current_key == key:
+            current_total = merge(current_total, value)
+        else:
+            if current_key is not None:
+                yield current_key, current_total
+            current_key = key
+            current_total = value
+    if current_key is not None:
+        yield current_key, current_total
+
+
+def _spill(reducer, totals, spill_dir):
+    """Write the totals to a key-sorted run file and return its path"""
+    fd, path = tempfile.mkstemp(prefix="reducer-spill-", suffix=".tsv", dir=spill_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as run:
+        for key in sorted(totals):
+            run.write(f"{key}\t{reducer.format_partial(key, totals[key])}\n")
+    return path
+
+
+def reduce_hashed(reducer, records, max_keys=DEFAULT_REDUCER_MAX_KEYS, spill_dir=None):
+    """Merge records in any order, spilling sorted runs past max_keys keys"""
+    merge = reducer.merge
+    totals = {}
+    runs = []
+    try:
+        for key, value in records:
+            total = totals.get(key)
+            if total is None:
+                totals[key] = value
+                if len(totals) > max_keys:
+                    runs.append(_spill(reducer, totals, spill_dir))
+                    totals = {}
+            else:
+                totals[key] = merge(total, value)
+
+        in_memory = sorted(totals.items(), key=itemgetter(0))
+        if not runs:
+            yield from in_memory
+            return
+
+        files = [open(path, encoding="utf-8") for path in runs]
+        try:
+            streams = [read_records(reducer, f) for f in files] + [iter(in_memory)]
+            yield from reduce_sorted(reducer, heapq.merge(*streams, key=itemgetter(0)))
+        finally:
+            for f in files:
+                f.close()
+    finally:
+        for path in runs:
+            os.remove(path)
+
+
+def add_reducer_arguments(parser):
+    parser.add_argument("--hash", action="store_true",
+                        help="aggregate in a hash table so the input need not be sorted")
+    parser.add_argument("--max-keys", type=int, default=DEFAULT_REDUCER_MAX_KEYS,
+                        help="keys held in memory by --hash before spilling to disk "
+                             f"(default {DEFAULT_REDUCER_MAX_KEYS})")
+    parser.add_argument("--spill-dir", help="directory for --hash spill files (default: system temp)")
+    parser.add_argument("--combiner", action="store_true",
+                        help="write partial results in the mapper's format (for -combiner)")
+    parser.add_argument("--binary", action="store_true",
+                        help="read typedbytes records (and write them with --combiner)")
+
+
+def _counted(totals, counters):
+    """Pass the totals through and report the counters once they are exhausted"""
+    keys = 0
+    for item in totals:
+        keys += 1
+        yield item
+    counters.incr("Keys reduced", keys)
+    counters.report()
+
+
+def reduce_totals(reducer, args, stream=None, counters=None):
+    """Yield (key, total) for the input according to the parsed flags"""
+    counters = counters or Counters()
+    if args.binary:
+        records = read_binary_records(reducer, stream or sys.stdin.buffer, counters)
+    else:
+        records = read_records(reducer, stream or sys.stdin, counters)
+    if args.hash:
+        totals = reduce_hashed(reducer, records, args.max_keys, args.spill_dir)
+    else:
+        totals = reduce_sorted(reducer, records)
+    return _counted(totals, counters)
+
+
+def reduce_records(reducer, args, stream=None):
+    """Yield (key, text) results for the input according to the parsed flags"""
+    format_result = reducer.format_partial if args.combiner else reducer.format
+    for key, total in reduce_totals(reducer, args, stream):
+        yield key, format_result(key, total)
+
+
+def write_partials(reducer, args, totals):
+    """Write (key, total) pairs as combiner output, as text or typedbytes"""
+    if args.binary:
+        from typedbytes import encode, encode_key
+
+        write = sys.stdout.buffer.write
+        for key, total in totals:
+            write(encode_key(key) + encode(reducer.partial_value(key, total)))
+        sys.stdout.buffer.flush()
+        return
+    write = sys.stdout.write
+    for key, total in totals:
+        write(f"{key}\t{reducer.format_partial(key, total)}\n")
+    sys.stdout.flush()
+
+
+def run_reducer(reducer, description=None):
+    """Reduce stdin to stdout as "key\\tresult" lines"""
+    parser = argparse.ArgumentParser(description=description)
+    add_reducer_arguments(parser)
+    args = parser.parse_args()
+
+    if args.combiner:
+        write_partials(reducer, args, reduce_totals(reducer, args))
+        return
+    write = sys.stdout.write
+    for key, text in reduce_records(reducer, args):
+        write(f"{key}\t{text}\n")
+    sys.stdout.flush()
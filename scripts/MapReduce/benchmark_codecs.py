@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Benchmark the input codecs of compression.py on one trip CSV.
+#
+# For each codec the input is compressed into splittable blocks and the
+# compression ratio, compress and decompress throughput (one process, MB of
+# CSV per second) are measured, followed by a run_local.py job over the
+# compressed file with every worker. "none" is the plain CSV, so the job
+# times show what each codec costs or saves end to end. Local disks hide
+# most of the I/O saving that HDFS reads get from a smaller input, so the
+# ratio matters as much as the job time.
+#
+#   python benchmark_codecs.py --rows 1000000 --output codecs.json
+#   python benchmark_codecs.py --input nyc_all_yellow_taxi_data_2023_2025_combined.csv
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+from benchmark_scripts import HERE, git_commit
+from compression import CODECS, compress_file, read_blocks
+
+JOB = ("mapper_trips_per_day.py --combine", "reducer_trips_per_day.py")
+
+
+def run_job(input_path, work_dir, workers, split_size, map_output_codec):
+    output = os.path.join(work_dir, "job-output")
+    shutil.rmtree(output, ignore_errors=True)
+    mapper, reducer = JOB
+    argv = [sys.executable, "run_local.py", "--input", input_path, "--output", output, "--mapper", mapper,
+            "--reducer", reducer, "--workers", str(workers), "--split-size", str(split_size)]
+    if map_output_codec:
+        argv += ["--map-output-codec", map_output_codec]
+    started = time.perf_counter()
+    subprocess.run(argv, cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def benchmark_codec(codec, source, work_dir, args):
+    raw_bytes = os.path.getsize(source)
+    result = {"codec": codec or "none", "raw_bytes": raw_bytes}
+    if codec:
+        target = os.path.join(work_dir, os.path.basename(source) + CODECS[codec])
+        started = time.perf_counter()
+        compress_file(source, target, codec, args.block_size << 20, workers=1)
+        result["compress_mb_s"] = raw_bytes / 1e6 / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in read_blocks(target, 0, os.path.getsize(target)):
+            pass
+        result["decompress_mb_s"] = raw_bytes / 1e6 / (time.perf_counter() - started)
+        result["bytes"] = os.path.getsize(target)
+    else:
+        target = source
+        result["bytes"] = raw_bytes
+    result["ratio"] = raw_bytes / result["bytes"]
+    result["job_seconds"] = run_job(target, work_dir, args.workers, args.split_size, args.map_output_codec)
+    if codec:
+        os.remove(target)
+    return result
+
+
+def print_results(results):
+    header = f"{'codec':6} {'bytes':>14} {'ratio':>6} {'compress MB/s':>14} {'decompress MB/s':>16} {'job s':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        compress = f"{r['compress_mb_s']:14.1f}" if "compress_mb_s" in r else f"{'-':>14}"
+        decompress = f"{r['decompress_mb_s']:16.1f}" if "decompress_mb_s" in r else f"{'-':>16}"
+        print(f"{r['codec']:6} {r['bytes']:14,} {r['ratio']:6.2f} {compress} {decompress} {r['job_seconds']:7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compression codecs for the trip inputs")
+    parser.add_argument("--rows", type=int, default=500000, help="rows to generate")
+    parser.add_argument("--input", help="plain trip CSV to use instead of generated rows")
+    parser.add_argument("--codecs", nargs="+", choices=["none"] + sorted(CODECS),
+                        default=["none"] + sorted(CODECS), help="codecs to measure")
+    parser.add_argument("--block-size", type=int, default=16, help="uncompressed MB per block")
+    parser.add_argument("--split-size", type=int, default=16, help="run_local.py split size in MB")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="run_local.py processes")
+    parser.add_argument("--map-output-codec", choices=sorted(CODECS), help="also compress the map output")
+    parser.add_argument("--seed", type=int, default=42, help="generator seed (fixes the input)")
+    parser.add_argument("--output", help="JSON results file (default: codecs-<commit>.json)")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    with tempfile.TemporaryDirectory(prefix="benchmark-codecs-") as work_dir:
+        source = args.input
+        if not source:
+            source = os.path.join(work_dir, "trips.csv")
+            print(f"Generating {args.rows:,} rows...")
+            subprocess.run([sys.executable, "generate_trips.py", "--rows", str(args.rows), "--seed", str(args.seed),
+                            "--output", source], cwd=HERE, check=True)
+
+        results = []
+        for codec in args.codecs:
+            print(f"Benchmarking {codec}...")
+            results.append(benchmark_codec(None if codec == "none" else codec, source, work_dir, args))
+
+    print()
+    print_results(results)
+
+    report = {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cpus": os.cpu_count(),
+        "input": args.input or f"generated:{args.rows}:seed={args.seed}",
+        "block_size_mb": args.block_size,
+        "results": results,
+    }
+    output = args.output or f"codecs-{commit}.json"
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# Compare mapper throughput (rows/sec) of the shared taxi_parser mappers
+# against the original per-script parsing (split + strptime, csv.DictReader).
+#
+#   python benchmark_parser.py --rows 500000
+#   python benchmark_parser.py --input yellow_tripdata_2023-01.csv
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+
+from taxi_parser import YELLOW_COLUMNS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Parsing loops of the mappers before taxi_parser.py, kept for comparison
+# (column positions adjusted to the yellow layout of the generated rows)
+LEGACY_MAPPERS = {
+    "mapper_trips_per_day.py": '''
+import sys, datetime
+for line in sys.stdin:
+    line = line.strip()
+    if not line or line.startswith("lpep_pickup_datetime"):
+        continue
+    parts = line.split(',')
+    try:
+        pickup_date = datetime.datetime.strptime(parts[1].strip(), "%Y-%m-%d %H:%M:%S").date()
+        print(f"{pickup_date}\\t1")
+    except:
+        continue
+''',
+    "mapper_fare_per_day.py": '''
+import sys, datetime
+for line in sys.stdin:
+    line = line.strip()
+    if not line or line.startswith("lpep_pickup_datetime"):
+        continue
+    parts = line.split(',')
+    try:
+        fare = float(parts[16].strip())
+        pickup_date = datetime.datetime.strptime(parts[1].strip(), "%Y-%m-%d %H:%M:%S").date()
+        print(f"{pickup_date}\\t{fare}")
+    except:
+        continue
+''',
+    "mapper_passenger_distance_per_day.py": '''
+import sys, csv
+for row in csv.DictReader(sys.stdin):
+    try:
+        date = row['tpep_pickup_datetime'].split(' ')[0]
+        passengers = float(row['passenger_count']) if row['passenger_count'] else 0
+        distance = float(row['trip_distance']) if row['trip_distance'] else 0
+        print(f"{date}\\t{passengers},{distance}")
+    except Exception:
+        continue
+''',
+    "mapper_trips_per_payment.py": '''
+import sys
+for line in sys.stdin:
+    line = line.strip()
+    if not line or line.startswith("lpep_pickup_datetime"):
+        continue
+    parts = line.split(',')
+    try:
+        print(f"{parts[9].strip()}\\t1")
+    except:
+        continue
+''',
+    "mapper_trips_per_pulocation.py": '''
+import sys
+for line in sys.stdin:
+    line = line.strip()
+    if not line or line.startswith("lpep_pickup_datetime"):
+        continue
+    parts = line.split(',')
+    try:
+        print(f"{parts[7].strip()}\\t1")
+    except:
+        continue
+''',
+}
+
+
+def write_sample(path, rows, seed=42):
+    """Write a yellow taxi CSV with random but well-formed trips"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(YELLOW_COLUMNS[:19]) + "\n")
+        for _ in range(rows):
+            day = rng.randint(1, 28)
+            hour = rng.randint(0, 23)
+            fare = round(rng.uniform(3, 80), 2)
+            f.write(
+                f"2,2023-01-{day:02d} {hour:02d}:{rng.randint(0, 59):02d}:10,"
+                f"2023-01-{day:02d} {hour:02d}:59:36,{rng.randint(1, 4)}.0,"
+                f"{rng.uniform(0.1, 20):.2f},1.0,N,{rng.randint(1, 265)},{rng.randint(1, 265)},"
+                f"{rng.randint(1, 4)},{fare},1.0,0.5,0.0,0.0,1.0,{fare + 2.5:.2f},2.5,0.0\n"
+            )
+
+
+def count_rows(path):
+    with open(path, "rb") as f:
+        return sum(1 for _ in f) - 1
+
+
+def time_command(command, input_path):
+    """Run a mapper over the input and return the elapsed seconds"""
+    with open(input_path, "rb") as stdin:
+        start = time.perf_counter()
+        subprocess.run(command, stdin=stdin, stdout=subprocess.DEVNULL, cwd=HERE, check=True)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mapper parsing throughput")
+    parser.add_argument("--input", help="trip CSV to use instead of generated rows")
+    parser.add_argument("--rows", type=int, default=200000, help="rows to generate")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = args.input
+        if not input_path:
+            input_path = os.path.join(temp_dir, "sample.csv")
+            print(f"Generating {args.rows:,} rows...")
+            write_sample(input_path, args.rows)
+        rows = count_rows(input_path)
+
+        print(f"\n{'mapper':40} {'legacy rows/s':>14} {'parser rows/s':>14} {'combine rows/s':>15} {'speedup':>8}")
+        print("-" * 95)
+        for script, legacy in LEGACY_MAPPERS.items():
+            legacy_time = time_command([sys.executable, "-c", legacy], input_path)
+            new_time = time_command([sys.executable, script], input_path)
+            combine_time = time_command([sys.executable, script, "--combine"], input_path)
+            print(f"{script:40} {rows / legacy_time:14,.0f} {rows / new_time:14,.0f} "
+                  f"{rows / combine_time:15,.0f} {legacy_time / new_time:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
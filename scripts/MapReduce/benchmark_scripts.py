@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# Benchmark every streaming job stage by stage on a fixed generated input.
+#
+# For each job the mapper is run with and without --combine, its output is
+# sorted with LC_ALL=C sort (as in "mapper | sort | reducer"), and the reducer
+# is run on the sorted and (with --hash) the unsorted map output. Each stage
+# records wall time, rows/sec, CPU time and peak RSS of its process (from
+# wait4) and output bytes; the chains add up map, sort and reduce. Linux
+# carries the parent's RSS high-water mark into a forked child, so the input
+# is generated in a separate process to keep this one small.
+#
+# Results are written as JSON tagged with the git commit, so runs can be
+# compared across commits or parser variants:
+#
+#   python benchmark_scripts.py --rows 500000 --output before.json
+#   python benchmark_scripts.py --rows 500000 --output after.json --compare before.json
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# job -> (mapper, reducer, mapper supports --combine)
+JOBS = {
+    "trips_per_day": ("mapper_trips_per_day.py", "reducer_trips_per_day.py", True),
+    "fare_per_day": ("mapper_fare_per_day.py", "reducer_fare_per_day.py", True),
+    "passenger_distance_per_day": ("mapper_passenger_distance_per_day.py",
+                                   "reducer_passenger_distance_per_day.py", True),
+    "revenue_per_day": ("mapper_revenue_per_day.py", "reducer_revenue_per_day.py", True),
+    "trips_per_payment": ("mapper_trips_per_payment.py", "reducer_trips_per_payment.py", True),
+    "trips_per_pulocation": ("mapper_trips_per_pulocation.py", "reducer_trips_per_pulocation.py", True),
+    "trips_per_hour": ("mapper_trips_per_hour.py", "reducer_trips_per_hour.py", True),
+    "all_metrics": ("mapper_all_metrics.py", "reducer_all_metrics.py", True),
+    "quantiles_per_day": ("mapper_quantiles_per_day.py", "reducer_quantiles_per_day.py", False),
+    "distinct_zones": ("mapper_distinct_zones.py", "reducer_distinct_zones.py", False),
+    "top_locations": ("mapper_top_locations.py", "reducer_top_locations.py", False),
+}
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no", "."], cwd=HERE,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def count_lines(path):
+    with open(path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+def run_stage(argv, input_path, output_path, env):
+    """Run one process from file to file and return its measurements"""
+    with open(input_path, "rb") as stdin, open(output_path, "wb") as stdout:
+        started = time.perf_counter()
+        proc = subprocess.Popen(argv, stdin=stdin, stdout=stdout, stderr=subprocess.DEVNULL, cwd=HERE, env=env)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - started
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited with status {proc.returncode}")
+    return {
+        "seconds": elapsed,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "max_rss_mb": usage.ru_maxrss / 1024,  # KB on Linux
+        "output_bytes": os.path.getsize(output_path),
+    }
+
+
+def best_of(repeat, argv, input_path, output_path, env):
+    runs = [run_stage(argv, input_path, output_path, env) for _ in range(repeat)]
+    return min(runs, key=lambda run: run["seconds"])
+
+
+def benchmark_job(name, input_path, rows, work_dir, repeat, env):
+    """Measure the stages and chains of one job and return the result records"""
+    mapper, reducer, combines = JOBS[name]
+    python = sys.executable
+    results = []
+
+    def stage(label, argv, stage_input, input_rows):
+        output = os.path.join(work_dir, f"{name}.{label}.out")
+        result = best_of(repeat, argv, stage_input, output, env)
+        result.update(job=name, stage=label, command=" ".join(os.path.basename(a) for a in argv[1:] or argv),
+                      input_rows=input_rows, rows_per_s=input_rows / result["seconds"])
+        results.append(result)
+        return result, output
+
+    sort = ["sort"]
+    mapped, map_output = stage("map", [python, mapper], input_path, rows)
+    map_lines = count_lines(map_output)
+    sorted_, sort_output = stage("sort", sort, map_output, map_lines)
+    reduced, _ = stage("reduce", [python, reducer], sort_output, map_lines)
+    stage("reduce --hash", [python, reducer, "--hash"], map_output, map_lines)
+    chains = [("chain", [mapped, sorted_, reduced])]
+
+    if combines:
+        combined, combined_output = stage("map --combine", [python, mapper, "--combine"], input_path, rows)
+        combined_lines = count_lines(combined_output)
+        sorted_combined, sorted_combined_output = stage("sort (combined)", sort, combined_output, combined_lines)
+        reduced_combined, _ = stage("reduce (combined)", [python, reducer], sorted_combined_output, combined_lines)
+        chains.append(("chain --combine", [combined, sorted_combined, reduced_combined]))
+
+    for label, stages in chains:
+        seconds = sum(s["seconds"] for s in stages)
+        results.append({
+            "job": name, "stage": label, "command": " | ".join(s["command"] for s in stages),
+            "input_rows": rows, "seconds": seconds, "rows_per_s": rows / seconds,
+            "cpu_seconds": sum(s["cpu_seconds"] for s in stages),
+            "max_rss_mb": max(s["max_rss_mb"] for s in stages),
+            "output_bytes": stages[-1]["output_bytes"],
+        })
+    return results
+
+
+def print_results(results, baseline=None):
+    previous = {(r["job"], r["stage"]): r for r in baseline["results"]} if baseline else {}
+    header = f"{'job':28} {'stage':18} {'rows/s':>12} {'cpu s':>8} {'rss MB':>8} {'out bytes':>13}"
+    if previous:
+        header += f" {'vs base':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        line = (f"{r['job']:28} {r['stage']:18} {r['rows_per_s']:12,.0f} {r['cpu_seconds']:8.2f} "
+                f"{r['max_rss_mb']:8.1f} {r['output_bytes']:13,}")
+        base = previous.get((r["job"], r["stage"]))
+        if base:
+            line += f" {r['rows_per_s'] / base['rows_per_s']:7.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the mapper/reducer scripts stage by stage")
+    parser.add_argument("--rows", type=int, default=200000, help="rows to generate")
+    parser.add_argument("--input", help="trip CSV to use instead of generated rows")
+    parser.add_argument("--jobs", nargs="+", choices=sorted(JOBS), default=list(JOBS), help="jobs to benchmark")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=42, help="generator seed (fixes the input)")
+    parser.add_argument("--output", help="JSON results file (default: benchmark-<commit>.json)")
+    parser.add_argument("--compare", help="earlier JSON results to compare rows/s against")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as work_dir:
+        env = dict(os.environ, LC_ALL="C", TAXI_COUNTERS_DIR=os.path.join(work_dir, "counters"))
+        input_path = args.input
+        if not input_path:
+            input_path = os.path.join(work_dir, "trips.csv")
+            print(f"Generating {args.rows:,} rows...")
+            subprocess.run([sys.executable, "generate_trips.py", "--rows", str(args.rows), "--seed", str(args.seed),
+                            "--output", input_path], cwd=HERE, check=True)
+        rows = count_lines(input_path) - 1
+
+        results = []
+        for name in args.jobs:
+            print(f"Benchmarking {name}...")
+            results.extend(benchmark_job(name, input_path, rows, work_dir, args.repeat, env))
+        input_bytes = os.path.getsize(input_path)
+
+    print()
+    print_results(results, baseline)
+
+    report = {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cpus": os.cpu_count(),
+        "input": args.input or f"generated:{args.rows}:seed={args.seed}",
+        "input_rows": rows,
+        "input_bytes": input_bytes,
+        "results": results,
+    }
+    output = args.output or f"benchmark-{commit}.json"
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Block-compressed, splittable trip files and transparent decompression.
+
+A compressed input is written as a sequence of independent blocks, each
+holding whole CSV lines, so any run of blocks can be decompressed on its
+own. Concatenated blocks are still one valid .bz2/.gz/.zst/.lz4 file
+(bzip2, gzip, zstd and lz4 all accept concatenated streams/frames), so the
+usual tools read it unchanged. The block offsets are kept in a hidden
+sidecar index, .<name>.idx, one "offset\\tcompressed size\\traw size" line
+per block; Hadoop skips names starting with "." when it lists an input.
+
+    python compression.py --codec bz2 nyc_all_yellow_taxi_data_2023_2025_combined.csv
+
+run_local.py cuts indexed files into splits on block boundaries and
+decompresses them on the fly; compressed files without an index are read
+as one split, as Hadoop does for gzip. Map output and job output can be
+compressed too (run_local.py --map-output-codec / --output-codec), and
+output_loader.py reads compressed part files.
+
+On Hadoop bzip2 is the splittable codec (BZip2Codec splits on its block
+markers); zstd and lz4 files are read whole by one mapper, so use them for
+intermediate data and outputs rather than for large inputs:
+
+    -D mapreduce.map.output.compress=true \\
+    -D mapreduce.map.output.compress.codec=org.apache.hadoop.io.compress.Lz4Codec \\
+    -D mapreduce.output.fileoutputformat.compress=true \\
+    -D mapreduce.output.fileoutputformat.compress.codec=org.apache.hadoop.io.compress.BZip2Codec
+
+bzip2 and gzip come from the standard library; zstd and lz4 use the codecs
+bundled with pyarrow, which is imported only when one of them is used, so
+plain and gzip/bzip2 jobs run without it.
+"""
+import os
+import io
+import bz2
+import sys
+import gzip
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# codec -> file suffix
+CODECS = {"bz2": ".bz2", "gzip": ".gz", "zstd": ".zst", "lz4": ".lz4"}
+SUFFIXES = {suffix: codec for codec, suffix in CODECS.items()}
+DEFAULT_BLOCK_SIZE = 16 << 20
+READ_BUFFER = 1 << 20
+
+
+def codec_of(path):
+    """The codec named by a file's suffix, or None for plain files"""
+    return SUFFIXES.get(os.path.splitext(path)[1])
+
+
+def index_path(path):
+    folder, name = os.path.split(path)
+    return os.path.join(folder, f".{name}.idx")
+
+
+def compress_block(data, codec):
+    if codec == "bz2":
+        return bz2.compress(data, 9)
+    if codec == "gzip":
+        return gzip.compress(data, 6, mtime=0)
+    import pyarrow as pa
+    return pa.Codec(codec).compress(data, asbytes=True)
+
+
+def decompress_block(data, codec, raw_size):
+    if codec == "bz2":
+        return bz2.decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    import pyarrow as pa
+    return pa.Codec(codec).decompress(data, decompressed_size=raw_size, asbytes=True)
+
+
+def open_compressed(path, mode="rb", codec=None):
+    """Open a file for reading or writing, (de)compressing it by its suffix.
+
+    ``mode`` is "rb", "wb", "rt" or "wt"; text mode is UTF-8.
+    """
+    codec = codec or codec_of(path)
+    binary_mode = mode.replace("t", "")
+    if codec is None:
+        stream = open(path, binary_mode)
+    elif codec == "bz2":
+        stream = bz2.open(path, binary_mode)
+    elif codec == "gzip":
+        stream = gzip.open(path, binary_mode, compresslevel=6)
+    else:
+        import pyarrow as pa
+        if "r" in binary_mode:
+            stream = io.BufferedReader(pa.input_stream(path, compression=codec), READ_BUFFER)
+        else:
+            stream = io.BufferedWriter(pa.output_stream(path, compression=codec, buffer_size=0), READ_BUFFER)
+    if "t" in mode:
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return stream
+
+
+def read_index(path):
+    """[(offset, compressed size, raw size)] of the blocks, or None without an index"""
+    try:
+        with open(index_path(path)) as f:
+            return [tuple(map(int, line.split("\t"))) for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+
+
+def block_splits(path, split_size):
+    """(path, start, end) byte ranges of runs of whole blocks holding about split_size raw bytes"""
+    blocks = read_index(path)
+    if blocks is None:
+        return None
+    splits = []
+    start = raw = 0
+    for offset, size, raw_size in blocks:
+        raw += raw_size
+        if raw >= split_size:
+            splits.append((path, start, offset + size))
+            start = offset + size
+            raw = 0
+    if raw or not splits:
+        splits.append((path, start, os.path.getsize(path)))
+    return splits
+
+
+def read_blocks(path, start, end):
+    """Yield the decompressed bytes of the blocks between two block boundaries"""
+    codec = codec_of(path)
+    blocks = [block for block in read_index(path) if start <= block[0] < end]
+    with open(path, "rb") as f:
+        for offset, size, raw_size in blocks:
+            f.seek(offset)
+            yield decompress_block(f.read(size), codec, raw_size)
+
+
+def read_whole(path):
+    """Yield the decompressed bytes of an unindexed compressed file in large chunks"""
+    with open_compressed(path, "rb") as f:
+        yield from iter(lambda: f.read(READ_BUFFER), b"")
+
+
+def line_blocks(stream, block_size):
+    """Cut a byte stream into blocks of about block_size that end on a newline"""
+    carry = b""
+    while True:
+        chunk = stream.read(block_size)
+        if not chunk:
+            break
+        data = carry + chunk
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            carry = data
+            continue
+        carry = data[cut:]
+        yield data[:cut]
+    if carry:
+        yield carry
+
+
+def compress_file(source, target, codec, block_size=DEFAULT_BLOCK_SIZE, workers=None):
+    """Write source as independently compressed line blocks plus the sidecar index"""
+    workers = workers or os.cpu_count()
+    index = []
+    with open_compressed(source, "rb") as src, open(target + ".tmp", "wb") as out, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+
+        def write_next():
+            future, raw_size = pending.popleft()
+            data = future.result()
+            index.append((out.tell(), len(data), raw_size))
+            out.write(data)
+
+        # Keep a bounded number of blocks in flight, written back in order
+        for block in line_blocks(src, block_size):
+            pending.append((pool.submit(compress_block, block, codec), len(block)))
+            if len(pending) >= 2 * workers:
+                write_next()
+        while pending:
+            write_next()
+
+    with open(index_path(target) + ".tmp", "w") as f:
+        f.writelines(f"{offset}\t{size}\t{raw_size}\n" for offset, size, raw_size in index)
+    os.replace(target + ".tmp", target)
+    os.replace(index_path(target) + ".tmp", index_path(target))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress trip CSVs into splittable blocks with an index")
+    parser.add_argument("inputs", nargs="+", help="files to compress (may themselves be compressed)")
+    parser.add_argument("--codec", choices=sorted(CODECS), default="bz2")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE >> 20,
+                        help=f"uncompressed MB per block (default {DEFAULT_BLOCK_SIZE >> 20})")
+    parser.add_argument("--output-dir", help="folder for the compressed files (default: next to the input)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parallel compression processes")
+    args = parser.parse_args()
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    for source in args.inputs:
+        if not os.path.exists(source):
+            print(f"❌ Input not found: {source}")
+            sys.exit(1)
+        name = os.path.basename(source)
+        if codec_of(name):
+            name = os.path.splitext(name)[0]
+        target = os.path.join(args.output_dir or os.path.dirname(source), name + CODECS[args.codec])
+        started = time.perf_counter()
+        index = compress_file(source, target, args.codec, args.block_size << 20, args.workers)
+        raw = sum(block[2] for block in index)
+        size = os.path.getsize(target)
+        print(f"✅ {target}: {len(index)} blocks, {raw / 1e6:,.1f} MB -> {size / 1e6:,.1f} MB "
+              f"({raw / max(size, 1):.1f}x) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
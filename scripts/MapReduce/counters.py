@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Job counters for the streaming mappers and reducers.
+
+Scripts count rows read, rows skipped by reason and time spent, and report
+the totals once at the end. Under Hadoop Streaming (detected through the
+mapreduce_task_id / mapred_task_id variables it exports) they are written
+to stderr as
+
+    reporter:counter:<group>,<name>,<value>
+
+and show up with the job counters. Under run_local.py, which points
+TAXI_COUNTERS_DIR at its work folder, they are written as JSON to
+<TAXI_COUNTERS_DIR>/<group>-<pid>.json and collect_counters() sums and
+deletes them. Run on their own (cat | mapper | reducer) the scripts print
+a one-line summary to stderr instead, so no files are left behind.
+
+Times are reported in milliseconds. When an "Emit" time was recorded,
+"Parse ms" is the rest of the run (reading, splitting, parsing and
+combining), and "Rows emitted" is the rows read less the rows skipped.
+"""
+import os
+import sys
+import json
+import glob
+import time
+from contextlib import contextmanager
+
+SKIPPED = "Skipped"
+
+
+def under_hadoop():
+    return "mapreduce_task_id" in os.environ or "mapred_task_id" in os.environ
+
+
+def counters_dir():
+    return os.environ.get("TAXI_COUNTERS_DIR")
+
+
+class Counters:
+    def __init__(self, group=None):
+        self.group = group or os.path.splitext(os.path.basename(sys.argv[0]))[0] or "python"
+        self.values = {}
+        self.seconds = {}
+        self.started = time.perf_counter()
+
+    def incr(self, name, amount=1):
+        self.values[name] = self.values.get(name, 0) + amount
+
+    def skip(self, reason):
+        """Count a row that produced no output"""
+        self.incr(f"{SKIPPED} ({reason})")
+
+    def add_time(self, name, seconds):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def totals(self):
+        values = dict(self.values)
+        if "Rows read" in values:
+            skipped = sum(v for name, v in values.items() if name.startswith(SKIPPED))
+            values["Rows emitted"] = values["Rows read"] - skipped
+        total = time.perf_counter() - self.started
+        for name, seconds in self.seconds.items():
+            values[f"{name} ms"] = round(seconds * 1000)
+        if "Emit" in self.seconds:
+            values["Parse ms"] = round((total - sum(self.seconds.values())) * 1000)
+        values["Total ms"] = round(total * 1000)
+        return values
+
+    def report(self):
+        values = self.totals()
+        if under_hadoop():
+            for name, value in values.items():
+                sys.stderr.write(f"reporter:counter:{self.group},{name},{value}\n")
+            sys.stderr.flush()
+            return
+        folder = counters_dir()
+        if not folder:
+            summary = ", ".join(f"{name}={value:,}" for name, value in values.items())
+            sys.stderr.write(f"{self.group}: {summary}\n")
+            sys.stderr.flush()
+            return
+        try:
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"{self.group}-{os.getpid()}.json"), "w") as f:
+                json.dump({self.group: values}, f, indent=2)
+        except OSError as e:
+            sys.stderr.write(f"Could not write counters: {e}\n")
+
+
+def collect_counters(folder):
+    """Sum the JSON counter files in a folder per group and name, deleting them once read"""
+    totals = {}
+    for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        with open(path) as f:
+            for group, values in json.load(f).items():
+                group_totals = totals.setdefault(group, {})
+                for name, value in values.items():
+                    group_totals[name] = group_totals.get(name, 0) + value
+        os.remove(path)
+    return totals
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# Generate synthetic NYC taxi trips for load and scale testing.
+#
+# Rows follow the yellow (tpep_*) or green (lpep_*) TLC column layout from
+# taxi_parser.py, so every mapper reads them like the real monthly files.
+# Pickup days are weighted by month (seasonality) and weekday, pickup hours
+# by a diurnal curve, and pickup/dropoff zones by a Zipf distribution with the
+# busiest real zones (JFK, Midtown, Upper East Side, ...) at the top. A small
+# share of dirty rows is mixed in: short rows, impossible dates, non-numeric
+# amounts, empty passenger counts and stray years (2008, 2022) like the ones
+# found in the real data.
+#
+# Rows are built a batch at a time and streamed out, so memory does not grow
+# with --rows; --parts writes several files in parallel processes:
+#
+#   python generate_trips.py --rows 1000000 --output trips.csv
+#   python generate_trips.py --rows 2000000000 --parts 32 --output /data/synthetic --format parquet
+#   python generate_trips.py --rows 10000000 --output - | hdfs dfs -put - /MIT805A1/synthetic.csv
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+from taxi_parser import SCHEMAS
+
+BATCH_ROWS = 100000
+DEFAULT_DIRTY_RATE = 0.001
+ZONES = 265
+# Busiest yellow pickup zones first; the rest follow in a fixed shuffled order
+BUSY_ZONES = [237, 161, 236, 132, 162, 230, 186, 142, 170, 163, 239, 48, 234, 68, 138, 79, 107, 140, 141, 249]
+AIRPORT_ZONES = {1, 132, 138}
+# Relative demand by month (Jan..Dec), weekday (Mon..Sun) and hour of day
+MONTH_WEIGHTS = [0.85, 0.88, 1.05, 1.02, 1.05, 1.0, 0.92, 0.9, 0.98, 1.08, 1.0, 1.02]
+WEEKDAY_WEIGHTS = [0.9, 1.0, 1.05, 1.1, 1.12, 1.05, 0.85]
+HOUR_WEIGHTS = [2.8, 1.8, 1.2, 0.8, 0.6, 0.8, 2.0, 3.6, 4.4, 4.4, 4.4, 4.6,
+                4.9, 5.0, 5.3, 5.5, 5.3, 5.9, 6.3, 5.9, 5.1, 5.0, 4.8, 3.8]
+# Average speed in mph by hour (slowest in the afternoon peak)
+HOUR_SPEEDS = [19, 20, 21, 22, 22, 20, 16, 12, 10, 10, 10, 10,
+               10, 10, 9, 9, 9, 9, 10, 12, 14, 15, 16, 17]
+PAYMENT_TYPES = [1, 2, 3, 4, 0]
+PAYMENT_WEIGHTS = [0.74, 0.18, 0.01, 0.02, 0.05]
+PASSENGERS = [0, 1, 2, 3, 4, 5, 6]
+PASSENGER_WEIGHTS = [0.02, 0.74, 0.14, 0.04, 0.02, 0.02, 0.02]
+DIRTY_KINDS = ("short row", "bad date", "bad number", "empty passengers", "stray year")
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def parse_month(text):
+    year, month = text.split("-")
+    return datetime.date(int(year), int(month), 1)
+
+
+def month_days(start, end):
+    """Every day from the first of start up to the end of the end month"""
+    last = datetime.date(end.year + end.month // 12, end.month % 12 + 1, 1)
+    return [start + datetime.timedelta(days=i) for i in range((last - start).days)]
+
+
+def zone_order(seed=805):
+    rest = [zone for zone in range(1, ZONES + 1) if zone not in BUSY_ZONES]
+    random.Random(seed).shuffle(rest)
+    return BUSY_ZONES + rest
+
+
+def zipf_cum_weights(n, exponent):
+    return list(accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+
+
+class TripGenerator:
+    """Builds batches of trips as columns (lists of Python values)"""
+
+    def __init__(self, taxi_type, start, end, zipf, dirty_rate, seed):
+        self.taxi_type = taxi_type
+        self.columns = SCHEMAS[taxi_type]
+        self.prefix = "tpep" if taxi_type == "yellow" else "lpep"
+        self.rng = random.Random(seed)
+        self.dirty_rate = dirty_rate
+        self.days = month_days(start, end)
+        # One extra day so trips that end after midnight on the last day have a date
+        self.day_text = [day.isoformat() for day in self.days + [self.days[-1] + datetime.timedelta(days=1)]]
+        self.day_seconds = [(day - EPOCH).days * 86400 for day in self.days]
+        self.day_years = [day.year for day in self.days]
+        self.day_weights = list(accumulate(
+            MONTH_WEIGHTS[day.month - 1] * WEEKDAY_WEIGHTS[day.weekday()] for day in self.days))
+        self.hour_weights = list(accumulate(HOUR_WEIGHTS))
+        self.zones = zone_order()
+        self.zone_weights = zipf_cum_weights(ZONES, zipf)
+        self.times = [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(86400)]
+
+    def batch(self, n):
+        """Return {column: values} for n trips plus the row indexes to make dirty"""
+        rng = self.rng
+        random_ = rng.random
+        days = rng.choices(range(len(self.days)), cum_weights=self.day_weights, k=n)
+        hours = rng.choices(range(24), cum_weights=self.hour_weights, k=n)
+        pickup_sod = [hour * 3600 + int(random_() * 3600) for hour in hours]
+        distance = [min(60.0, max(0.1, round(rng.lognormvariate(0.6, 0.8), 2))) for _ in range(n)]
+        duration = [int(d / HOUR_SPEEDS[h] * 3600 * (0.8 + 0.4 * random_())) + 60 for d, h in zip(distance, hours)]
+        pu = rng.choices(self.zones, cum_weights=self.zone_weights, k=n)
+        do = rng.choices(self.zones, cum_weights=self.zone_weights, k=n)
+        payment = rng.choices(PAYMENT_TYPES, PAYMENT_WEIGHTS, k=n)
+        passengers = rng.choices(PASSENGERS, PASSENGER_WEIGHTS, k=n)
+
+        fare = [round(3.0 + 2.5 * d + 0.5 * t / 60, 2) for d, t in zip(distance, duration)]
+        extra = [1.0 if 16 <= h < 20 else (0.5 if h >= 20 or h < 6 else 0.0) for h in hours]
+        tip = [round(f * (0.1 + 0.15 * random_()), 2) if p == 1 else 0.0 for f, p in zip(fare, payment)]
+        tolls = [6.94 if d > 8 and random_() < 0.3 else 0.0 for d in distance]
+        congestion = [2.5 if random_() < 0.9 else 0.0 for _ in range(n)]
+        airport = [1.75 if zone in AIRPORT_ZONES else 0.0 for zone in pu]
+        cbd = [0.75 if self.day_years[day] >= 2025 and random_() < 0.3 else 0.0 for day in days]
+        total = [round(f + e + 0.5 + t + tl + 1.0 + c + a + b, 2)
+                 for f, e, t, tl, c, a, b in zip(fare, extra, tip, tolls, congestion, airport, cbd)]
+
+        day_seconds = self.day_seconds
+        dropoff_sod = [s + t for s, t in zip(pickup_sod, duration)]
+        columns = {
+            "VendorID": rng.choices((1, 2), (0.3, 0.7), k=n),
+            "pickup": [day_seconds[day] + s for day, s in zip(days, pickup_sod)],
+            "dropoff": [day_seconds[day] + s for day, s in zip(days, dropoff_sod)],
+            "passenger_count": passengers,
+            "trip_distance": distance,
+            "RatecodeID": [2 if zone == 132 else 1 for zone in pu],
+            "store_and_fwd_flag": ["Y" if random_() < 0.005 else "N" for _ in range(n)],
+            "PULocationID": pu,
+            "DOLocationID": do,
+            "payment_type": payment,
+            "fare_amount": fare,
+            "extra": extra,
+            "mta_tax": [0.5] * n,
+            "tip_amount": tip,
+            "tolls_amount": tolls,
+            "ehail_fee": [None] * n,
+            "improvement_surcharge": [1.0] * n,
+            "total_amount": total,
+            "trip_type": [1] * n,
+            "congestion_surcharge": congestion,
+            "Airport_fee": airport,
+            "cbd_congestion_fee": cbd,
+        }
+        # Keep the day index and second-of-day for fast text formatting
+        columns["_day"] = days
+        columns["_pickup_sod"] = pickup_sod
+        columns["_dropoff_sod"] = dropoff_sod
+
+        dirty = int(n * self.dirty_rate)
+        if random_() < n * self.dirty_rate - dirty:
+            dirty += 1
+        return columns, rng.sample(range(n), dirty) if dirty else []
+
+    def csv_lines(self, columns, dirty):
+        """Format a batch as CSV text lines, with the dirty rows spoiled"""
+        day_text = self.day_text
+        times = self.times
+        days = columns["_day"]
+        text = {
+            "pickup": [f"{day_text[d]} {times[s]}" for d, s in zip(days, columns["_pickup_sod"])],
+            "dropoff": [f"{day_text[d + s // 86400]} {times[s % 86400]}"
+                        for d, s in zip(days, columns["_dropoff_sod"])],
+        }
+        for name in ("passenger_count", "RatecodeID"):
+            text[name] = [f"{v}.0" for v in columns[name]]
+        text["ehail_fee"] = [""] * len(days)
+        order = []
+        for column in self.columns:
+            name = column.replace(f"{self.prefix}_", "").replace("_datetime", "")
+            if name not in text:
+                text[name] = list(map(str, columns[column]))
+            order.append(text[name])
+        rows = [",".join(fields) for fields in zip(*order)]
+
+        index = {column.replace(f"{self.prefix}_", "").replace("_datetime", ""): i
+                 for i, column in enumerate(self.columns)}
+        rng = self.rng
+        for i in dirty:
+            fields = rows[i].split(",")
+            kind = rng.choice(DIRTY_KINDS)
+            if kind == "short row":
+                fields = fields[:rng.randint(1, len(fields) - 1)]
+            elif kind == "bad date":
+                fields[index["pickup"]] = rng.choice(("2023-02-30 12:00:00", "NULL", "01/15/2023 08:30"))
+            elif kind == "bad number":
+                fields[index["total_amount"]] = fields[index["fare_amount"]] = rng.choice(("N/A", "abc", "-"))
+            elif kind == "empty passengers":
+                fields[index["passenger_count"]] = ""
+            else:
+                year = rng.choice(("2008-12-31", "2022-12-31", "2009-01-01"))
+                fields[index["pickup"]] = f"{year} {fields[index['pickup']][11:]}"
+            rows[i] = ",".join(fields)
+        return rows
+
+    def arrow_table(self, columns, dirty):
+        """A typed Arrow table; dirty rows become nulls and stray years (Parquet has no bad text)"""
+        import pyarrow as pa
+
+        pickup = list(columns["pickup"])
+        passengers = list(columns["passenger_count"])
+        total = list(columns["total_amount"])
+        rng = self.rng
+        for i in dirty:
+            kind = rng.choice(("empty passengers", "bad number", "stray year"))
+            if kind == "empty passengers":
+                passengers[i] = None
+            elif kind == "bad number":
+                total[i] = None
+            else:
+                pickup[i] = (datetime.date(2008, 12, 31) - EPOCH).days * 86400 + pickup[i] % 86400
+        values = dict(columns, pickup=pickup, passenger_count=passengers, total_amount=total)
+
+        types = {"VendorID": pa.int32(), "PULocationID": pa.int32(), "DOLocationID": pa.int32(),
+                 "passenger_count": pa.int64(), "RatecodeID": pa.int64(), "payment_type": pa.int64(),
+                 "trip_type": pa.int64(), "store_and_fwd_flag": pa.string()}
+        arrays = []
+        for column in self.columns:
+            name = column.replace(f"{self.prefix}_", "").replace("_datetime", "")
+            if name in ("pickup", "dropoff"):
+                # Epoch seconds, stored with the microsecond unit of the TLC files
+                arrays.append(pa.array(values[name], pa.timestamp("s")).cast(pa.timestamp("us")))
+            else:
+                arrays.append(pa.array(values[column], types.get(column, pa.float64())))
+        return pa.table(arrays, names=self.columns)
+
+
+def open_output(path):
+    if path == "-":
+        return sys.stdout.buffer
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return open(path, "wb")
+
+
+def generate(path, rows, options, seed):
+    """Write rows trips to one file and return the number written"""
+    generator = TripGenerator(options["taxi_type"], options["start"], options["end"],
+                              options["zipf"], options["dirty_rate"], seed)
+    written = 0
+    if options["format"] == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            while written < rows:
+                n = min(options["batch"], rows - written)
+                table = generator.arrow_table(*generator.batch(n))
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression="snappy")
+                writer.write_table(table)
+                written += n
+        finally:
+            if writer:
+                writer.close()
+        return written
+
+    out = open_output(path)
+    try:
+        out.write((",".join(generator.columns) + "\n").encode("utf-8"))
+        while written < rows:
+            n = min(options["batch"], rows - written)
+            lines = generator.csv_lines(*generator.batch(n))
+            out.write(("\n".join(lines) + "\n").encode("utf-8"))
+            written += n
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic NYC taxi trip data")
+    parser.add_argument("--rows", type=int, required=True, help="number of trips")
+    parser.add_argument("--output", required=True,
+                        help="output file, '-' for stdout, or a folder when --parts > 1")
+    parser.add_argument("--taxi-type", choices=sorted(SCHEMAS), default="yellow")
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--start", type=parse_month, default=parse_month("2023-01"), help="first month, YYYY-MM")
+    parser.add_argument("--end", type=parse_month, default=parse_month("2025-12"), help="last month, YYYY-MM")
+    parser.add_argument("--zipf", type=float, default=1.1, help="zone popularity skew (Zipf exponent)")
+    parser.add_argument("--dirty-rate", type=float, default=DEFAULT_DIRTY_RATE, help="share of dirty rows")
+    parser.add_argument("--parts", type=int, default=1, help="files written in parallel processes")
+    parser.add_argument("--batch", type=int, default=BATCH_ROWS, help="rows generated per batch")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.end < args.start:
+        parser.error("--end is before --start")
+    if args.format == "parquet" and args.output == "-":
+        parser.error("Parquet output needs a file")
+    if args.parts > 1 and args.output == "-":
+        parser.error("--parts needs an output folder")
+
+    options = {
+        "taxi_type": args.taxi_type, "format": args.format, "start": args.start, "end": args.end,
+        "zipf": args.zipf, "dirty_rate": args.dirty_rate, "batch": args.batch,
+    }
+    started = time.perf_counter()
+    if args.parts == 1:
+        written = generate(args.output, args.rows, options, args.seed)
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        extension = "parquet" if args.format == "parquet" else "csv"
+        per_part = math.ceil(args.rows / args.parts)
+        with ProcessPoolExecutor(max_workers=min(args.parts, os.cpu_count())) as pool:
+            futures = [
+                pool.submit(generate, os.path.join(args.output, f"part-{part:05d}.{extension}"),
+                            min(per_part, args.rows - part * per_part), options, args.seed + part)
+                for part in range(args.parts) if part * per_part < args.rows
+            ]
+            written = sum(future.result() for future in futures)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {written:,} {args.taxi_type} trips in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s): {args.output}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
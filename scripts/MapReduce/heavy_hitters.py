@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Mergeable bounded-memory heavy-hitter summary (Misra-Gries / Space-Saving).
+
+At most k counters are kept (2k between reductions). Each reported count
+is a lower bound on the true count, and undercounts by no more than
+``max_error()`` = (n - sum of counters) / (k + 1), where n is the number of
+items added. Summaries built by different mappers merge with the same
+guarantee (Agarwal et al., "Mergeable Summaries").
+
+Text form (no tabs or newlines, so it can be a streaming value):
+    k;n;item=count,item=count,...
+"""
+DEFAULT_K = 2000
+
+
+class HeavyHitters:
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.n = 0
+        self.counts = {}
+
+    def add(self, item, count=1):
+        counts = self.counts
+        self.n += count
+        current = counts.get(item)
+        if current is None:
+            counts[item] = count
+            if len(counts) > 2 * self.k:
+                self._reduce()
+        else:
+            counts[item] = current + count
+
+    def _reduce(self):
+        """Subtract the (k+1)-th largest count from every counter and drop the non-positive ones"""
+        if len(self.counts) <= self.k:
+            return
+        cut = sorted(self.counts.values(), reverse=True)[self.k]
+        self.counts = {item: c - cut for item, c in self.counts.items() if c > cut}
+
+    def merge(self, other):
+        self.n += other.n
+        counts = self.counts
+        for item, count in other.counts.items():
+            counts[item] = counts.get(item, 0) + count
+        self._reduce()
+        return self
+
+    def max_error(self):
+        return (self.n - sum(self.counts.values())) / (self.k + 1)
+
+    def top(self, size):
+        """The most frequent items as [(item, count lower bound)]"""
+        return sorted(self.counts.items(), key=lambda entry: (-entry[1], entry[0]))[:size]
+
+    def serialize(self):
+        self._reduce()
+        items = ",".join(f"{item}={count}" for item, count in self.counts.items())
+        return f"{self.k};{self.n};{items}"
+
+    @classmethod
+    def deserialize(cls, text):
+        k, n, items = text.split(";", 2)
+        summary = cls(int(k))
+        summary.n = int(n)
+        for entry in items.split(",") if items else []:
+            item, count = entry.rsplit("=", 1)
+            summary.counts[item] = int(count)
+        return summary
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""HyperLogLog distinct-count sketch with a one-line text form.
+
+Items are hashed to 64 bits with blake2b, so sketches built by different
+mapper processes agree and can be merged by taking register maxima. The
+relative standard error is about 1.04/sqrt(2**p).
+
+Text form (no tabs or newlines, so it can be a streaming value):
+    p;base64(zlib(registers))
+"""
+import math
+import zlib
+import base64
+import hashlib
+
+DEFAULT_ERROR = 0.02
+MIN_P = 4
+MAX_P = 18
+
+
+def precision_for_error(error):
+    """Smallest precision whose standard error is at most the given fraction"""
+    p = math.ceil(math.log2((1.04 / error) ** 2))
+    return max(MIN_P, min(MAX_P, p))
+
+
+def hash64(item):
+    return int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    def __init__(self, p=None, error=DEFAULT_ERROR):
+        self.p = p or precision_for_error(error)
+        self.m = 1 << self.p
+        self.registers = bytearray(self.m)
+
+    def add(self, item):
+        self.add_hash(hash64(item))
+
+    def add_hash(self, h):
+        bits = 64 - self.p
+        index = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError(f"cannot merge sketches with precision {self.p} and {other.p}")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self):
+        m = self.m
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    def serialize(self):
+        packed = base64.b64encode(zlib.compress(bytes(self.registers))).decode("ascii")
+        return f"{self.p};{packed}"
+
+    @classmethod
+    def deserialize(cls, text):
+        p, packed = text.split(";", 1)
+        sketch = cls(int(p))
+        try:
+            sketch.registers = bytearray(zlib.decompress(base64.b64decode(packed)))
+        except zlib.error as e:
+            raise ValueError(f"corrupt sketch: {e}")
+        if len(sketch.registers) != sketch.m:
+            raise ValueError("register count does not match precision")
+        return sketch
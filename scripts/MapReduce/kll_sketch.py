@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Mergeable KLL quantile sketch with a one-line text form.
+
+Memory stays around 3*k values however many are added, and sketches built
+by different mappers merge into one with the same error guarantee (rank
+error of roughly 1.7/k). Alongside the compactors the sketch keeps exact
+count, min, max and sum.
+
+Text form (no tabs or newlines, so it can be a streaming value):
+    k;count;min;max;sum;level0,values|level1,values|...
+"""
+import math
+import random
+
+DEFAULT_K = 200
+C = 2.0 / 3.0
+
+
+class KLLSketch:
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.random = random.Random(seed)
+        self.compactors = []
+        self.size = 0
+        self.max_size = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.total = 0.0
+        self._grow()
+
+    def _grow(self):
+        self.compactors.append([])
+        height = len(self.compactors)
+        self.max_size = sum(self._capacity(h, height) for h in range(height))
+
+    def _capacity(self, h, height=None):
+        depth = (height or len(self.compactors)) - h - 1
+        return int(math.ceil(C ** depth * self.k)) + 1
+
+    def update(self, value):
+        self.compactors[0].append(value)
+        self.size += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if self.size >= self.max_size:
+            self._compress()
+
+    def _compress(self):
+        for h, compactor in enumerate(self.compactors):
+            if len(compactor) >= self._capacity(h):
+                if h + 1 >= len(self.compactors):
+                    self._grow()
+                # Keep every other item of the sorted level, from a random offset
+                compactor.sort()
+                keep_odd = self.random.random() < 0.5
+                last = compactor.pop() if len(compactor) % 2 else None
+                self.compactors[h + 1].extend(compactor[keep_odd::2])
+                compactor[:] = [] if last is None else [last]
+                self.size = sum(len(c) for c in self.compactors)
+                break
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, items in enumerate(other.compactors):
+            self.compactors[h].extend(items)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.size = sum(len(c) for c in self.compactors)
+        while self.size >= self.max_size:
+            self._compress()
+        return self
+
+    def quantiles(self, fractions):
+        """Estimated values at the given rank fractions (0..1)"""
+        weighted = sorted(
+            (item, 1 << h) for h, items in enumerate(self.compactors) for item in items
+        )
+        total_weight = sum(weight for _, weight in weighted)
+        results = []
+        for fraction in fractions:
+            if not weighted:
+                results.append(math.nan)
+                continue
+            target = fraction * total_weight
+            cumulative = 0
+            for item, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    break
+            results.append(item)
+        return results
+
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def serialize(self):
+        levels = "|".join(",".join(repr(v) for v in items) for items in self.compactors)
+        return f"{self.k};{self.count};{self.min!r};{self.max!r};{self.total!r};{levels}"
+
+    @classmethod
+    def deserialize(cls, text):
+        k, count, low, high, total, levels = text.split(";")
+        sketch = cls(int(k))
+        sketch.compactors = [
+            [float(v) for v in level.split(",")] if level else [] for level in levels.split("|")
+        ]
+        height = len(sketch.compactors)
+        sketch.max_size = sum(sketch._capacity(h, height) for h in range(height))
+        sketch.size = sum(len(c) for c in sketch.compactors)
+        sketch.count = int(count)
+        sketch.min = float(low)
+        sketch.max = float(high)
+        sketch.total = float(total)
+        return sketch
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# Single-pass mapper for every per-day/per-key metric.
+#
+# Each trip row is split once and emitted under one tag per metric:
+#   trips_per_day, fare_per_day, passenger_distance_per_day,
+#   trips_per_payment, trips_per_pulocation
+#
+# Output lines are "<tag>\t<key>\t<value>", so the streaming job must treat
+# the first two fields as the key:
+#
+#   hadoop jar hadoop-streaming.jar \
+#       -D stream.num.map.output.key.fields=2 \
+#       -files mapper_all_metrics.py,reducer_all_metrics.py,aggregate.py,counters.py,taxi_parser.py,named_outputs.py \
+#       -mapper "mapper_all_metrics.py --combine" -reducer reducer_all_metrics.py \
+#       -input /MIT805A1/combined_all_yellow_taxi_data -output /MIT805A1/output_all_metrics
+from aggregate import mapper_output
+from taxi_parser import TripReader, pickup_date, to_cents, to_number
+
+out = mapper_output("Emit tagged records for every per-day and per-key metric")
+emit = out.emit
+counters = out.counters
+
+reader = TripReader(("pickup", "total", "passengers", "distance", "payment", "pulocation"), counters=counters)
+pickup_col, fare_col, passengers_col, distance_col, payment_col, pulocation_col = reader.columns
+
+for parts in reader:
+    try:
+        date = pickup_date(parts[pickup_col])
+    except IndexError:
+        counters.skip("short row")
+        continue
+
+    # A bad date or number only drops the metrics that need it. Those drops
+    # are counted apart from "Skipped", which is kept for rows that emit nothing.
+    if date:
+        emit(f"trips_per_day\t{date}", 1)
+        try:
+            emit(f"fare_per_day\t{date}", to_cents(parts[fare_col]))
+        except (IndexError, ValueError):
+            counters.incr("Dropped fare (bad number)")
+        try:
+            passengers = to_number(parts[passengers_col])
+            distance = to_number(parts[distance_col])
+            emit(f"passenger_distance_per_day\t{date}", (passengers, distance))
+        except (IndexError, ValueError):
+            counters.incr("Dropped passengers and distance (bad number)")
+    else:
+        counters.incr("Dropped per-day metrics (bad date)")
+
+    try:
+        payment_type = parts[payment_col].strip()
+        pulocation = parts[pulocation_col].strip()
+    except IndexError:
+        if date:
+            counters.incr("Dropped per-key metrics (short row)")
+        else:
+            counters.skip("short row")
+        continue
+    emit(f"trips_per_payment\t{payment_type}", 1)
+    emit(f"trips_per_pulocation\t{pulocation}", 1)
+
+out.close()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Build HyperLogLog sketches of the distinct pickup zones (PULocationID) and
+# distinct PU->DO routes per pickup day and per month. One sketch per
+# (tag, period) is written at end of input:
+#   zones_per_day    2023-01-01  <sketch>
+#   routes_per_month 2023-01     <sketch>
+#
+#   hadoop jar hadoop-streaming.jar \
+#       -D stream.num.map.output.key.fields=2 \
+#       -files mapper_distinct_zones.py,reducer_distinct_zones.py,hyperloglog.py,aggregate.py,counters.py,taxi_parser.py,named_outputs.py \
+#       -mapper "mapper_distinct_zones.py --error 0.01" -reducer reducer_distinct_zones.py \
+#       -input /MIT805A1/combined_all_yellow_taxi_data -output /MIT805A1/output_distinct_zones
+import sys
+import argparse
+
+from counters import Counters
+from hyperloglog import HyperLogLog, DEFAULT_ERROR, precision_for_error, hash64
+from taxi_parser import TripReader, pickup_date
+
+MAX_CACHED = 200000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit per-day and per-month distinct zone/route sketches")
+    parser.add_argument("--error", type=float, default=DEFAULT_ERROR,
+                        help=f"target relative standard error (default {DEFAULT_ERROR})")
+    args = parser.parse_args()
+    p = precision_for_error(args.error)
+
+    counters = Counters()
+    reader = TripReader(("pickup", "pulocation", "dolocation"), counters=counters)
+    pickup_col, pulocation_col, dolocation_col = reader.columns
+    sketches = {}
+    hashes = {}
+
+    def sketch_for(tag, period):
+        sketch = sketches.get((tag, period))
+        if sketch is None:
+            sketch = sketches[(tag, period)] = HyperLogLog(p)
+        return sketch
+
+    def hashed(item):
+        h = hashes.get(item)
+        if h is None:
+            if len(hashes) >= MAX_CACHED:
+                hashes.clear()
+            h = hashes[item] = hash64(item)
+        return h
+
+    for parts in reader:
+        try:
+            date = pickup_date(parts[pickup_col])
+            pulocation = parts[pulocation_col].strip()
+            dolocation = parts[dolocation_col].strip()
+        except IndexError:
+            counters.skip("short row")
+            continue
+        if not date:
+            counters.skip("bad date")
+            continue
+        if not pulocation:
+            counters.skip("missing zone")
+            continue
+
+        month = date[:7]
+        zone = hashed(pulocation)
+        sketch_for("zones_per_day", date).add_hash(zone)
+        sketch_for("zones_per_month", month).add_hash(zone)
+        if dolocation:
+            route = hashed(f"{pulocation}>{dolocation}")
+            sketch_for("routes_per_day", date).add_hash(route)
+            sketch_for("routes_per_month", month).add_hash(route)
+
+    write = sys.stdout.write
+    with counters.timed("Emit"):
+        for (tag, period), sketch in sketches.items():
+            write(f"{tag}\t{period}\t{sketch.serialize()}\n")
+        sys.stdout.flush()
+    counters.incr("Records written", len(sketches))
+    counters.report()
+
+
+if __name__ == "__main__":
+    main()
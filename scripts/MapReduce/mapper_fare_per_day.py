@@ -1,17 +1,27 @@
 #!/usr/bin/env python3
-import sys
-import datetime
+from aggregate import mapper_output
+from taxi_parser import TripReader, pickup_date, to_cents
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line or line.startswith("lpep_pickup_datetime"):
-        continue
+out = mapper_output("Emit the fare of each trip in cents keyed by pickup date")
+emit = out.emit
+skip = out.counters.skip
+
+reader = TripReader(("pickup", "total"), counters=out.counters)
+pickup_col, fare_col = reader.columns
 
-    parts = line.split(',')
+for parts in reader:
     try:
-        pickup_str = parts[1].strip()  # lpep_pickup_datetime
-        fare = float(parts[12].strip())  # total_amount
-        pickup_date = datetime.datetime.strptime(pickup_str, "%Y-%m-%d %H:%M:%S").date()
-        print(f"{pickup_date}\t{fare}")
-    except:
+        date = pickup_date(parts[pickup_col])
+        fare = to_cents(parts[fare_col])  # total_amount
+    except IndexError:
+        skip("short row")
         continue
+    except ValueError:
+        skip("bad number")
+        continue
+    if date:
+        emit(date, fare)
+    else:
+        skip("bad date")
+
+out.close()
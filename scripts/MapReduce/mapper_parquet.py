@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# Vectorized mapper that reads the monthly Parquet files directly.
+#
+# Each row group is read with only the columns the metric needs and grouped
+# with Arrow kernels, so no CSV text is produced or parsed. The partial sums
+# are printed in the same "key\tvalue" text as the line mappers (or tagged
+# "<tag>\t<key>\t<value>" for --metric all), so the existing reducers are
+# used unchanged.
+#
+# Parquet paths are given as arguments or one per line on stdin, which lets
+# Hadoop Streaming hand each map task a list of files. "hdfs dfs -ls -C"
+# prints paths without a scheme; under Hadoop (or with --hdfs) those are
+# opened on HDFS through fs.defaultFS rather than as local files:
+#
+#   hdfs dfs -ls -C /user/MukondeleliNegukhula/nyc_taxi/raw/*.parquet > files.txt
+#   hadoop jar hadoop-streaming.jar \
+#       -inputformat org.apache.hadoop.mapred.lib.NLineInputFormat \
+#       -files mapper_parquet.py,aggregate.py,counters.py,taxi_parser.py,reducer_fare_per_day.py \
+#       -mapper "mapper_parquet.py --metric fare_per_day" -reducer reducer_fare_per_day.py \
+#       -input files.txt -output /MIT805A1/output_fare_per_day
+#
+# Locally:
+#   python mapper_parquet.py --metric all ../../data/*.parquet | sort | python reducer_all_metrics.py
+import sys
+import argparse
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from aggregate import MapperOutput, DEFAULT_MAX_KEYS
+from counters import under_hadoop
+from taxi_parser import FIELDS
+
+# metric -> (fields to read, grouping field)
+METRICS = {
+    "trips_per_day": (("pickup",), "pickup"),
+    "fare_per_day": (("pickup", "total"), "pickup"),
+    "passenger_distance_per_day": (("pickup", "passengers", "distance"), "pickup"),
+    "trips_per_payment": (("payment",), "payment"),
+    "trips_per_pulocation": (("pulocation",), "pulocation"),
+}
+
+
+def find_columns(names, fields):
+    """Map each field to its column name in the Parquet schema"""
+    lowered = {name.lower(): name for name in names}
+    columns = {}
+    for field in fields:
+        for candidate in FIELDS[field]:
+            if candidate.lower() in lowered:
+                columns[field] = lowered[candidate.lower()]
+                break
+        else:
+            raise KeyError(f"no column for field '{field}' in Parquet schema")
+    return columns
+
+
+_hdfs = None
+
+
+def default_hdfs():
+    """The HDFS named by fs.defaultFS in the Hadoop configuration, connected once"""
+    global _hdfs
+    if _hdfs is None:
+        _hdfs = pafs.HadoopFileSystem("default")
+    return _hdfs
+
+
+def open_parquet(path, hdfs=False):
+    """Open a URI such as hdfs://namenode/path, or a path on HDFS or the local disk"""
+    if "://" in path:
+        filesystem, path = pafs.FileSystem.from_uri(path)
+        return pq.ParquetFile(filesystem.open_input_file(path))
+    if hdfs:
+        return pq.ParquetFile(default_hdfs().open_input_file(path))
+    return pq.ParquetFile(path)
+
+
+def group_sums(keys, values):
+    """Group the rows by key and return [(key, count, sums...)] with null keys dropped"""
+    # The key is counted through a copy since it cannot also be an aggregate input
+    table = pa.table(dict(key=keys, n=keys, **{f"v{i}": v for i, v in enumerate(values)}))
+    aggregations = [("n", "count")] + [(f"v{i}", "sum") for i in range(len(values))]
+    grouped = table.group_by("key").aggregate(aggregations)
+    grouped = grouped.filter(pc.is_valid(grouped["key"]))
+    columns = [grouped["key"].to_pylist(), grouped["n_count"].to_pylist()]
+    columns += [grouped[f"v{i}_sum"].to_pylist() for i in range(len(values))]
+    return zip(*columns)
+
+
+def map_row_group(table, columns, metrics, emit, tagged):
+    """Emit partial aggregates for one row group"""
+    days = None
+    if "pickup" in columns:
+        days = pc.cast(table[columns["pickup"]], pa.date32())
+
+    for metric in metrics:
+        prefix = f"{metric}\t" if tagged else ""
+        if metric == "trips_per_day":
+            for day, count in group_sums(days, []):
+                emit(f"{prefix}{day}", count)
+        elif metric == "fare_per_day":
+            # Whole cents per row, as the line mapper parses them
+            fares = pc.cast(pc.round(pc.multiply(table[columns["total"]], 100)), pa.int64())
+            for day, count, fare in group_sums(days, [fares]):
+                if fare is not None:
+                    emit(f"{prefix}{day}", fare)
+        elif metric == "passenger_distance_per_day":
+            values = [table[columns["passengers"]], table[columns["distance"]]]
+            for day, count, passengers, distance in group_sums(days, values):
+                emit(f"{prefix}{day}", (passengers or 0.0, distance or 0.0))
+        else:
+            field = METRICS[metric][1]
+            for key, count in group_sums(table[columns[field]], []):
+                emit(f"{prefix}{key}", count)
+
+
+def map_file(path, metrics, emit, tagged, hdfs=False):
+    parquet = open_parquet(path, hdfs)
+    fields = sorted({field for metric in metrics for field in METRICS[metric][0]})
+    columns = find_columns(parquet.schema_arrow.names, fields)
+    projection = sorted(set(columns.values()))
+    for index in range(parquet.num_row_groups):
+        table = parquet.read_row_group(index, columns=projection)
+        map_row_group(table, columns, metrics, emit, tagged)
+
+
+def input_paths(args):
+    if args.paths:
+        yield from args.paths
+        return
+    for line in sys.stdin:
+        # NLineInputFormat may prefix the line with its offset
+        path = line.strip().split('\t')[-1]
+        if path:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized mapper over Parquet trip files")
+    parser.add_argument("paths", nargs="*", help="Parquet files (read from stdin when omitted)")
+    parser.add_argument("--metric", choices=sorted(METRICS) + ["all"], default="all")
+    parser.add_argument("--max-keys", type=int, default=DEFAULT_MAX_KEYS,
+                        help=f"keys held before partial sums are flushed (default {DEFAULT_MAX_KEYS})")
+    parser.add_argument("--hdfs", action="store_true", default=under_hadoop(),
+                        help="open paths without a scheme on HDFS (default under Hadoop Streaming)")
+    args = parser.parse_args()
+
+    tagged = args.metric == "all"
+    metrics = sorted(METRICS) if tagged else [args.metric]
+    out = MapperOutput(combine=True, max_keys=args.max_keys)
+
+    for path in input_paths(args):
+        print(f"Mapping {path}", file=sys.stderr)
+        map_file(path, metrics, out.emit, tagged, args.hdfs)
+
+    out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
-import sys
-import csv
+from aggregate import mapper_output
+from taxi_parser import TripReader, pickup_date, to_number
 
-# Read CSV from stdin
-reader = csv.DictReader(sys.stdin)
-for row in reader:
+out = mapper_output("Emit passengers,distance of each trip keyed by pickup date")
+emit = out.emit
+skip = out.counters.skip
+
+reader = TripReader(("pickup", "passengers", "distance"), counters=out.counters)
+pickup_col, passengers_col, distance_col = reader.columns
+
+for parts in reader:
     try:
-        date = row['tpep_pickup_datetime'].split(' ')[0]  # extract date only
-        passengers = float(row['passenger_count']) if row['passenger_count'] else 0
-        distance = float(row['trip_distance']) if row['trip_distance'] else 0
-        # Emit date as key and passengers,distance as values
-        print(f"{date}\t{passengers},{distance}")
-    except Exception:
+        date = pickup_date(parts[pickup_col])
+        passengers = to_number(parts[passengers_col])
+        distance = to_number(parts[distance_col])
+    except IndexError:
+        skip("short row")
         continue
+    except ValueError:
+        skip("bad number")
+        continue
+    if date:
+        # Emit date as key and passengers,distance as values
+        emit(date, (passengers, distance))
+    else:
+        skip("bad date")
+
+out.close()
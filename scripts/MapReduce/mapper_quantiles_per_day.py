@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Emit one serialized KLL sketch of the fare (total_amount) or trip distance
+# per pickup date. Sketches are kept in memory per date and written at end of
+# input, or earlier when more than --max-keys dates are held.
+#
+#   python mapper_quantiles_per_day.py --metric fare < trips.csv | sort | python reducer_quantiles_per_day.py
+import sys
+import argparse
+
+from counters import Counters
+from kll_sketch import KLLSketch, DEFAULT_K
+from taxi_parser import TripReader, pickup_date
+
+COLUMNS = {"fare": "total", "distance": "distance"}
+DEFAULT_MAX_KEYS = 10000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit per-day quantile sketches")
+    parser.add_argument("--metric", choices=sorted(COLUMNS), default="fare")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help=f"sketch size (default {DEFAULT_K})")
+    parser.add_argument("--max-keys", type=int, default=DEFAULT_MAX_KEYS,
+                        help=f"sketches held before they are flushed (default {DEFAULT_MAX_KEYS})")
+    args = parser.parse_args()
+
+    counters = Counters()
+    reader = TripReader(("pickup", COLUMNS[args.metric]), counters=counters)
+    pickup_col, value_col = reader.columns
+    sketches = {}
+
+    def flush():
+        with counters.timed("Emit"):
+            for date, sketch in sketches.items():
+                sys.stdout.write(f"{date}\t{sketch.serialize()}\n")
+        counters.incr("Records written", len(sketches))
+        sketches.clear()
+
+    for parts in reader:
+        try:
+            date = pickup_date(parts[pickup_col])
+            value = float(parts[value_col])
+        except IndexError:
+            counters.skip("short row")
+            continue
+        except ValueError:
+            counters.skip("bad number")
+            continue
+        if not date:
+            counters.skip("bad date")
+            continue
+        sketch = sketches.get(date)
+        if sketch is None:
+            if len(sketches) >= args.max_keys:
+                flush()
+            sketch = sketches[date] = KLLSketch(args.k)
+        sketch.update(value)
+
+    flush()
+    sys.stdout.flush()
+    counters.report()
+
+
+if __name__ == "__main__":
+    main()
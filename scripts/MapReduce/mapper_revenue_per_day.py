@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# Emit the fare, tip, tolls and total amount of each trip in integer cents,
+# keyed by pickup date, for reducer_revenue_per_day.py.
+#
+#   python mapper_revenue_per_day.py --combine < trips.csv | sort | python reducer_revenue_per_day.py
+from aggregate import mapper_output
+from taxi_parser import TripReader, pickup_date, to_cents
+
+out = mapper_output("Emit fare,tip,tolls,total in cents of each trip keyed by pickup date")
+emit = out.emit
+skip = out.counters.skip
+
+reader = TripReader(("pickup", "fare", "tip", "tolls", "total"), counters=out.counters)
+pickup_col, fare_col, tip_col, tolls_col, total_col = reader.columns
+
+for parts in reader:
+    try:
+        date = pickup_date(parts[pickup_col])
+        amounts = (to_cents(parts[fare_col]), to_cents(parts[tip_col]),
+                   to_cents(parts[tolls_col]), to_cents(parts[total_col]))
+    except IndexError:
+        skip("short row")
+        continue
+    except ValueError:
+        skip("bad number")
+        continue
+    if date:
+        emit(date, amounts)
+    else:
+        skip("bad date")
+
+out.close()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Keep bounded heavy-hitter summaries of the busiest pickup zones
+# (PULocationID) and PU>DO routes, and emit one serialized summary per
+# (item type, group) at end of input:
+#   pulocation  all  <summary>
+#   route       all  <summary>
+# With --per-hour the group is the pickup hour ("00".."23") instead.
+#
+#   hadoop jar hadoop-streaming.jar \
+#       -D stream.num.map.output.key.fields=2 \
+#       -files mapper_top_locations.py,reducer_top_locations.py,heavy_hitters.py,aggregate.py,counters.py,taxi_parser.py,named_outputs.py \
+#       -mapper mapper_top_locations.py -reducer "reducer_top_locations.py --top 20" \
+#       -input /MIT805A1/combined_all_yellow_taxi_data -output /MIT805A1/output_top_locations
+import sys
+import argparse
+
+from counters import Counters
+from heavy_hitters import HeavyHitters, DEFAULT_K
+from taxi_parser import TripReader, pickup_hour
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit heavy-hitter summaries of pickup zones and routes")
+    parser.add_argument("--items", nargs="+", choices=("pulocation", "route"), default=("pulocation", "route"))
+    parser.add_argument("--per-hour", action="store_true", help="one summary per pickup hour")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help=f"counters per summary (default {DEFAULT_K})")
+    args = parser.parse_args()
+
+    counters = Counters()
+    reader = TripReader(("pickup", "pulocation", "dolocation"), counters=counters)
+    pickup_col, pulocation_col, dolocation_col = reader.columns
+    track_zones = "pulocation" in args.items
+    track_routes = "route" in args.items
+    summaries = {}
+
+    def summary_for(item_type, group):
+        summary = summaries.get((item_type, group))
+        if summary is None:
+            summary = summaries[(item_type, group)] = HeavyHitters(args.k)
+        return summary
+
+    zones = summary_for("pulocation", "all") if track_zones else None
+    routes = summary_for("route", "all") if track_routes else None
+
+    for parts in reader:
+        try:
+            pulocation = parts[pulocation_col].strip()
+            dolocation = parts[dolocation_col].strip()
+            pickup = parts[pickup_col]
+        except IndexError:
+            counters.skip("short row")
+            continue
+        if not pulocation:
+            counters.skip("missing zone")
+            continue
+
+        if args.per_hour:
+            hour = pickup_hour(pickup)
+            if not hour:
+                counters.skip("bad date")
+                continue
+            hour = hour[11:]
+            if track_zones:
+                summary_for("pulocation", hour).add(pulocation)
+            if track_routes and dolocation:
+                summary_for("route", hour).add(f"{pulocation}>{dolocation}")
+        else:
+            if track_zones:
+                zones.add(pulocation)
+            if track_routes and dolocation:
+                routes.add(f"{pulocation}>{dolocation}")
+
+    write = sys.stdout.write
+    with counters.timed("Emit"):
+        for (item_type, group), summary in summaries.items():
+            if summary.n:
+                write(f"{item_type}\t{group}\t{summary.serialize()}\n")
+                counters.incr("Records written")
+        sys.stdout.flush()
+    counters.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
-import sys
-import datetime
+from aggregate import mapper_output
+from taxi_parser import TripReader, pickup_date
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line or line.startswith("lpep_pickup_datetime"):
-        continue
+out = mapper_output("Emit 1 per trip keyed by pickup date")
+emit = out.emit
+skip = out.counters.skip
+
+reader = TripReader(("pickup",), counters=out.counters)
+pickup_col, = reader.columns
 
-    parts = line.split(',')
+for parts in reader:
     try:
-        pickup_str = parts[1].strip()  # lpep_pickup_datetime
-        pickup_date = datetime.datetime.strptime(pickup_str, "%Y-%m-%d %H:%M:%S").date()
-        print(f"{pickup_date}\t1")
-    except:
+        date = pickup_date(parts[pickup_col])
+    except IndexError:
+        skip("short row")
         continue
+    if date:
+        emit(date, 1)
+    else:
+        skip("bad date")
+
+out.close()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# Emit "trips,fare,passengers,distance" keyed by pickup hour ("YYYY-MM-DD HH"),
+# the fare in integer cents, for reducer_trips_per_hour.py, which also rolls
+# the hours up to days, months, quarters and years.
+from aggregate import mapper_output
+from taxi_parser import TripReader, pickup_hour, to_cents, to_number
+
+out = mapper_output("Emit trips, fare, passengers and distance keyed by pickup hour")
+emit = out.emit
+counters = out.counters
+skip = counters.skip
+
+reader = TripReader(("pickup", "total", "passengers", "distance"), counters=counters)
+pickup_col, fare_col, passengers_col, distance_col = reader.columns
+
+for parts in reader:
+    try:
+        hour = pickup_hour(parts[pickup_col])
+    except IndexError:
+        skip("short row")
+        continue
+    if not hour:
+        skip("bad date")
+        continue
+    # A bad amount only zeroes that value, so every trip is still counted
+    try:
+        fare = to_cents(parts[fare_col])  # total_amount
+    except (IndexError, ValueError):
+        fare = 0
+        counters.incr("Dropped fare (bad number)")
+    try:
+        passengers = to_number(parts[passengers_col])
+        distance = to_number(parts[distance_col])
+    except (IndexError, ValueError):
+        passengers = distance = 0
+        counters.incr("Dropped passengers and distance (bad number)")
+    emit(hour, (1, fare, passengers, distance))
+
+out.close()
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
-import sys
+from aggregate import mapper_output
+from taxi_parser import TripReader
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line or line.startswith("lpep_pickup_datetime"):
-        continue
+out = mapper_output("Emit 1 per trip keyed by payment type")
+emit = out.emit
+skip = out.counters.skip
+
+reader = TripReader(("payment",), counters=out.counters)
+payment_col, = reader.columns
 
-    parts = line.split(',')
+for parts in reader:
     try:
-        payment_type = parts[19].strip()  # Payment_type
-        print(f"{payment_type}\t1")
-    except:
+        payment_type = parts[payment_col].strip()
+    except IndexError:
+        skip("short row")
         continue
+    emit(payment_type, 1)
+
+out.close()
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
-import sys
+from aggregate import mapper_output
+from taxi_parser import TripReader
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line or line.startswith("lpep_pickup_datetime"):
-        continue
+out = mapper_output("Emit 1 per trip keyed by pickup location")
+emit = out.emit
+skip = out.counters.skip
+
+reader = TripReader(("pulocation",), counters=out.counters)
+pulocation_col, = reader.columns
 
-    parts = line.split(',')
+for parts in reader:
     try:
-        pulocation = parts[21].strip()  # PULocationID
-        print(f"{pulocation}\t1")
-    except:
+        pulocation = parts[pulocation_col].strip()
+    except IndexError:
+        skip("short row")
         continue
+    emit(pulocation, 1)
+
+out.close()
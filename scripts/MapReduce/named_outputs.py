@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Write tagged reducer records into Hadoop-style named output folders."""
+import os
+
+
+class NamedOutputs:
+    """Route records for each tag to <output_dir>/output_<tag>/part-NNNNN"""
+
+    def __init__(self, output_dir, part=0):
+        self.output_dir = output_dir
+        self.part_name = f"part-{part:05d}"
+        self.files = {}
+
+    def write(self, tag, record):
+        out = self.files.get(tag)
+        if out is None:
+            folder = os.path.join(self.output_dir, f"output_{tag}")
+            os.makedirs(folder, exist_ok=True)
+            out = open(os.path.join(folder, self.part_name), "w", encoding="utf-8")
+            self.files[tag] = out
+        out.write(record)
+        out.write("\n")
+
+    def close(self):
+        # Mark every folder complete the same way Hadoop does
+        for tag, out in self.files.items():
+            out.close()
+            folder = os.path.join(self.output_dir, f"output_{tag}")
+            open(os.path.join(folder, "_SUCCESS"), "w").close()
+        self.files = {}
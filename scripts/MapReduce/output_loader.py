@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Load MapReduce output folders into DataFrames for the visualizers.
+
+A folder is only read once Hadoop has marked it complete with _SUCCESS.
+Every part-* file is read (in parallel threads), header rows and blank or
+malformed lines are dropped, and the value columns are made numeric
+(int64 when every value is a whole number, as counts are). The combined
+frame is cached next to the parts as _cache-<digest>.parquet, where the
+digest covers the part files' names, sizes and mtimes, so later runs skip
+parsing until the job output changes. Names starting with "_"
+are ignored by Hadoop, so the cache never looks like a part file.
+Compressed part files (part-00000.bz2, .gz, .zst, .lz4) are decompressed
+as they are read.
+"""
+import os
+import glob
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from compression import open_compressed
+
+CACHE_PREFIX = "_cache-"
+# Bumped when normalize() changes, so caches of older frames are rebuilt
+CACHE_VERSION = 2
+
+
+def part_files(folder):
+    """The part files of an output folder in part-number order"""
+    return sorted(path for path in glob.glob(os.path.join(folder, "part-*"))
+                  if not path.endswith((".crc", ".idx")))
+
+
+def cache_path(folder, parts, columns, date_column, text_columns):
+    digest = hashlib.sha1()
+    digest.update(repr((CACHE_VERSION, columns, date_column, tuple(text_columns))).encode("utf-8"))
+    for path in parts:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return os.path.join(folder, f"{CACHE_PREFIX}{digest.hexdigest()[:16]}.parquet")
+
+
+def read_part(path, columns):
+    """Read one tab-separated (possibly compressed) part file as strings"""
+    if os.path.getsize(path) == 0:
+        return pd.DataFrame(columns=columns, dtype=str)
+    with open_compressed(path, "rb") as f:
+        try:
+            return pd.read_csv(f, sep="\t", header=None, names=columns, dtype=str,
+                               skip_blank_lines=True, on_bad_lines="skip")
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame(columns=columns, dtype=str)
+
+
+def normalize(df, columns, date_column, text_columns=()):
+    """Drop header and malformed rows and convert the column types"""
+    value_columns = [c for c in columns[1:] if c != date_column and c not in text_columns]
+    integral = {}
+    for column in value_columns:
+        text = df[column]
+        df[column] = pd.to_numeric(text, errors="coerce")
+        integral[column] = text.str.fullmatch(r"\s*-?\d+\s*")
+    if value_columns:
+        # Header rows such as "Date\tcount_trips_per_day" have no numeric values
+        keep = df[value_columns].notna().any(axis=1)
+        df = df[keep]
+        for column in value_columns:
+            # Counts stay int64 rather than the float64 the header rows forced
+            if df[column].notna().all() and integral[column][keep].all():
+                df[column] = df[column].astype("int64")
+    if date_column:
+        df[date_column] = pd.to_datetime(df[date_column], format="%Y-%m-%d", errors="coerce")
+        df = df.dropna(subset=[date_column])
+    return df.reset_index(drop=True)
+
+
+def load_output(folder, columns, date_column=None, text_columns=(), use_cache=True, require_success=True):
+    """Return the rows of every part file in a MapReduce output folder.
+
+    ``columns`` names the tab-separated fields; the first one is the key and
+    stays a string, the others are converted to numbers, except
+    ``text_columns`` and ``date_column`` (parsed as a YYYY-MM-DD date).
+    """
+    if require_success and not os.path.exists(os.path.join(folder, "_SUCCESS")):
+        raise FileNotFoundError(f"{folder} has no _SUCCESS marker (job incomplete or missing)")
+    parts = part_files(folder)
+    if not parts:
+        raise FileNotFoundError(f"no part files in {folder}")
+
+    cache = cache_path(folder, parts, columns, date_column, text_columns)
+    if use_cache and os.path.exists(cache):
+        try:
+            return pd.read_parquet(cache)
+        except (ImportError, ValueError, OSError):
+            pass
+
+    with ThreadPoolExecutor(max_workers=min(8, len(parts))) as pool:
+        frames = list(pool.map(lambda path: read_part(path, columns), parts))
+    df = normalize(pd.concat(frames, ignore_index=True), columns, date_column, text_columns)
+
+    if use_cache:
+        for stale in glob.glob(os.path.join(folder, f"{CACHE_PREFIX}*.parquet")):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass  # removed by another loader of the same folder
+        try:
+            df.to_parquet(cache, index=False)
+        except (ImportError, ValueError, OSError) as e:
+            print(f"⚠️ Could not cache {folder}: {e}")
+    return df
@@ -1,20 +1,4 @@
 #!/usr/bin/env python3
-import sys
+from aggregate import Reducer, run_reducer
 
-current_key = None
-current_count = 0
-
-for line in sys.stdin:
-    key, value = line.strip().split("\t")
-    value = int(value)
-    
-    if current_key == key:
-        current_count += value
-    else:
-        if current_key:
-            print(f"{current_key}\t{current_count}")
-        current_key = key
-        current_count = value
-
-if current_key:
-    print(f"{current_key}\t{current_count}")
+run_reducer(Reducer(), "Sum the trip counts per key")
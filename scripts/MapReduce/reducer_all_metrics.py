@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Reducer for mapper_all_metrics.py.
+#
+# Input is "<tag>\t<key>\t<value>" sorted on (tag, key). Each tag is reduced
+# the same way as its single-metric reducer. By default the results are
+# printed as "<tag>\t<key>\t<result>"; with --output-dir they are written to
+# one folder per metric instead (output_trips_per_day/part-00000, ...),
+# matching the layout of the separate jobs.
+#
+# The tagged output can be fed back in, so a finished cluster job is split
+# into named outputs with:
+#   hdfs dfs -cat /MIT805A1/output_all_metrics/part-* | python reducer_all_metrics.py --hash --output-dir data
+#
+# --hash and --combiner work as in the other reducers (see aggregate.py).
+import argparse
+
+from aggregate import Reducer, add_reducer_arguments, reduce_records, reduce_totals, write_partials
+from named_outputs import NamedOutputs
+from taxi_parser import format_cents, to_cents
+
+PAIR_METRICS = {"passenger_distance_per_day"}
+# Summed as integer cents and written as exact decimals
+CENTS_METRICS = {"fare_per_day"}
+
+
+class AllMetricsReducer(Reducer):
+    key_fields = 2
+
+    def parse(self, key, text):
+        tag = key.split('\t', 1)[0]
+        if tag in PAIR_METRICS:
+            # Mapper values are "passengers,distance"; reduced output uses a tab
+            passengers, distance = map(float, text.replace('\t', ',').split(','))
+            return [passengers, distance]
+        if tag in CENTS_METRICS and '.' in text:
+            # Final results are dollars; mapper and combiner values are cents
+            return to_cents(text)
+        return int(text)
+
+    def parse_value(self, key, value):
+        tag = key.split('\t', 1)[0]
+        if tag in PAIR_METRICS:
+            return [float(value[0]), float(value[1])]
+        return int(value)
+
+    def merge(self, total, value):
+        if type(total) is list:
+            total[0] += value[0]
+            total[1] += value[1]
+            return total
+        return total + value
+
+    def format(self, key, total):
+        if type(total) is list:
+            return f"{total[0]}\t{total[1]}"
+        if key.split('\t', 1)[0] in CENTS_METRICS:
+            return format_cents(total)
+        return str(total)
+
+    def format_partial(self, key, total):
+        if type(total) is list:
+            return f"{total[0]},{total[1]}"
+        return str(total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reduce tagged multi-metric mapper output")
+    add_reducer_arguments(parser)
+    parser.add_argument("--output-dir", help="write one output_<metric> folder per metric here")
+    parser.add_argument("--part", type=int, default=0, help="part file number for --output-dir")
+    args = parser.parse_args()
+
+    reducer = AllMetricsReducer()
+    if args.combiner:
+        write_partials(reducer, args, reduce_totals(reducer, args))
+        return
+
+    results = reduce_records(reducer, args)
+    if args.output_dir:
+        outputs = NamedOutputs(args.output_dir, args.part)
+        for key, text in results:
+            tag, key = key.split('\t', 1)
+            outputs.write(tag, f"{key}\t{text}")
+        outputs.close()
+    else:
+        for key, text in results:
+            print(f"{key}\t{text}")
+
+
+if __name__ == "__main__":
+    main()
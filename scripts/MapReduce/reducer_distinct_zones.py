@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Merge the HyperLogLog sketches from mapper_distinct_zones.py and output
+# "<tag>\t<period>\t<estimated distinct count>". With --output-dir each tag
+# is written to its own output_<tag> folder; with --combiner the merged
+# sketch is written instead of the estimate.
+import argparse
+
+from aggregate import Reducer, add_reducer_arguments, reduce_records, reduce_totals, write_partials
+from hyperloglog import HyperLogLog
+from named_outputs import NamedOutputs
+
+
+class DistinctReducer(Reducer):
+    key_fields = 2
+
+    def parse(self, key, text):
+        return HyperLogLog.deserialize(text)
+
+    def merge(self, total, value):
+        return total.merge(value)
+
+    def format(self, key, total):
+        return str(round(total.estimate()))
+
+    def format_partial(self, key, total):
+        return total.serialize()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge distinct zone/route sketches")
+    add_reducer_arguments(parser)
+    parser.add_argument("--output-dir", help="write one output_<tag> folder per tag here")
+    parser.add_argument("--part", type=int, default=0, help="part file number for --output-dir")
+    args = parser.parse_args()
+
+    reducer = DistinctReducer()
+    if args.combiner:
+        write_partials(reducer, args, reduce_totals(reducer, args))
+        return
+
+    results = reduce_records(reducer, args)
+    if args.output_dir:
+        outputs = NamedOutputs(args.output_dir, args.part)
+        for key, text in results:
+            tag, key = key.split('\t', 1)
+            outputs.write(tag, f"{key}\t{text}")
+        outputs.close()
+    else:
+        for key, text in results:
+            print(f"{key}\t{text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,22 @@
 #!/usr/bin/env python3
-import sys
+from aggregate import Reducer, run_reducer
+from taxi_parser import format_cents, to_cents
 
-current_date = None
-current_total = 0.0
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
+class FareReducer(Reducer):
+    # Fares are summed as integer cents, so totals are exact in any reduce order
+    def parse(self, key, text):
+        # Mapper and combiner values are cents; final results ("37044.20") are dollars
+        return to_cents(text) if '.' in text else int(text)
 
-    date, fare = line.split('\t')
-    try:
-        fare = float(fare)
-    except:
-        continue
+    def parse_value(self, key, value):
+        return int(value)
 
-    if current_date == date:
-        current_total += fare
-    else:
-        if current_date:
-            print(f"{current_date}\t{current_total}")
-        current_date = date
-        current_total = fare
+    def format(self, key, total):
+        return format_cents(total)
 
-if current_date:
-    print(f"{current_date}\t{current_total}")
+    def format_partial(self, key, total):
+        return str(total)
+
+
+run_reducer(FareReducer(), "Sum the fares per pickup date")
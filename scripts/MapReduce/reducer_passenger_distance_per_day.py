@@ -1,28 +1,27 @@
 #!/usr/bin/env python3
-import sys
-
-current_date = None
-total_passengers = 0
-total_distance = 0
-
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
-    date, values = line.split('\t')
-    passengers, distance = map(float, values.split(','))
-    
-    if current_date == date:
-        total_passengers += passengers
-        total_distance += distance
-    else:
-        if current_date:
-            # Output previous date totals
-            print(f"{current_date}\t{total_passengers}\t{total_distance}")
-        current_date = date
-        total_passengers = passengers
-        total_distance = distance
-
-# Print the last date totals
-if current_date:
-    print(f"{current_date}\t{total_passengers}\t{total_distance}")
+from aggregate import Reducer, run_reducer
+
+
+class PassengerDistanceReducer(Reducer):
+    def parse(self, key, text):
+        # Mapper values are "passengers,distance"; reduced output uses a tab
+        passengers, distance = map(float, text.replace('\t', ',').split(','))
+        return [passengers, distance]
+
+    def parse_value(self, key, value):
+        # --binary values are [passengers, distance]; empty columns arrive as int 0
+        return [float(value[0]), float(value[1])]
+
+    def merge(self, total, value):
+        total[0] += value[0]
+        total[1] += value[1]
+        return total
+
+    def format(self, key, total):
+        return f"{total[0]}\t{total[1]}"
+
+    def format_partial(self, key, total):
+        return f"{total[0]},{total[1]}"
+
+
+run_reducer(PassengerDistanceReducer(), "Sum the passengers and distance per pickup date")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# Merge the KLL sketches from mapper_quantiles_per_day.py and output
+#   date  count  min  max  mean  p50  p90  p99
+# With --combiner the merged sketch is written instead.
+from aggregate import Reducer, run_reducer
+from kll_sketch import KLLSketch
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class QuantileReducer(Reducer):
+    def parse(self, key, text):
+        return KLLSketch.deserialize(text)
+
+    def merge(self, total, value):
+        return total.merge(value)
+
+    def format(self, key, total):
+        p50, p90, p99 = total.quantiles(QUANTILES)
+        return f"{total.count}\t{total.min}\t{total.max}\t{total.mean():.4f}\t{p50}\t{p90}\t{p99}"
+
+    def format_partial(self, key, total):
+        return total.serialize()
+
+
+run_reducer(QuantileReducer(), "Merge per-day quantile sketches")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# Sum the fare, tip, tolls and total amount per pickup date. Amounts are
+# added as integer cents and written as exact decimals:
+#   2023-01-01\t<fare>\t<tip>\t<tolls>\t<total>
+from aggregate import Reducer, run_reducer
+from taxi_parser import format_cents, to_cents
+
+AMOUNTS = ("fare", "tip", "tolls", "total")
+
+
+class RevenueReducer(Reducer):
+    def parse(self, key, text):
+        # Mapper and combiner values are "fare,tip,tolls,total" in cents;
+        # final results are tab-separated dollars
+        if '\t' in text:
+            return [to_cents(v) for v in text.split('\t')]
+        fare, tip, tolls, total = map(int, text.split(','))
+        return [fare, tip, tolls, total]
+
+    def parse_value(self, key, value):
+        fare, tip, tolls, total = value
+        return [int(fare), int(tip), int(tolls), int(total)]
+
+    def merge(self, total, value):
+        for i, v in enumerate(value):
+            total[i] += v
+        return total
+
+    def format(self, key, total):
+        return "\t".join(map(format_cents, total))
+
+    def format_partial(self, key, total):
+        return ",".join(map(str, total))
+
+
+run_reducer(RevenueReducer(), "Sum the fare, tip, tolls and total in cents per pickup date")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Merge the heavy-hitter summaries from mapper_top_locations.py and output
+# the --top busiest items of each (item type, group):
+#   <item type>\t<group>\t<item>\t<count>\t<max undercount>
+# The true count of each item lies between count and count + max undercount.
+# With --output-dir each item type goes to output_top_<item type>; with
+# --combiner the merged summary is written instead.
+import argparse
+
+from aggregate import Reducer, add_reducer_arguments, reduce_records, reduce_totals, write_partials
+from heavy_hitters import HeavyHitters
+from named_outputs import NamedOutputs
+
+DEFAULT_TOP = 20
+
+
+class TopReducer(Reducer):
+    key_fields = 2
+
+    def __init__(self, top=DEFAULT_TOP):
+        self.top = top
+
+    def parse(self, key, text):
+        return HeavyHitters.deserialize(text)
+
+    def merge(self, total, value):
+        return total.merge(value)
+
+    def format(self, key, total):
+        error = int(total.max_error())
+        return "\n".join(f"{item}\t{count}\t{error}" for item, count in total.top(self.top))
+
+    def format_partial(self, key, total):
+        return total.serialize()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge heavy-hitter summaries into top-K lists")
+    add_reducer_arguments(parser)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"items per list (default {DEFAULT_TOP})")
+    parser.add_argument("--output-dir", help="write one output_top_<item type> folder per item type here")
+    parser.add_argument("--part", type=int, default=0, help="part file number for --output-dir")
+    args = parser.parse_args()
+
+    reducer = TopReducer(args.top)
+    if args.combiner:
+        write_partials(reducer, args, reduce_totals(reducer, args))
+        return
+
+    results = reduce_records(reducer, args)
+
+    outputs = NamedOutputs(args.output_dir, args.part) if args.output_dir else None
+    for key, text in results:
+        if not text:
+            # Every count was trimmed away on ties; there is no top list to write
+            continue
+        item_type, group = key.split('\t', 1)
+        for row in text.split("\n"):
+            if outputs:
+                outputs.write(f"top_{item_type}", f"{group}\t{row}")
+            else:
+                print(f"{key}\t{row}")
+    if outputs:
+        outputs.close()
+
+
+if __name__ == "__main__":
+    main()
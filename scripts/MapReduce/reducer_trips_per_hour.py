@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Reduce mapper_trips_per_hour.py output and roll it up in one pass. Each
+# line is "<rollup>\t<period>\t<trips>\t<fare>\t<passengers>\t<distance>":
+#   trip_totals_per_hour     2023-01-01 00
+#   trip_totals_per_day      2023-01-01
+#   trip_totals_per_month    2023-01
+#   trip_totals_per_quarter  2023-Q1
+#   trip_totals_per_year     2023
+# Fares are summed as integer cents and written as exact decimals.
+# With --output-dir each roll-up is written to its own output_<rollup>
+# folder. Roll-ups are complete only when one reducer sees every hour, so
+# run the streaming job with -numReduceTasks 1 (the input is at most one
+# line per hour once the mapper runs with --combine); the reducer stops
+# when the job has more reducers (mapreduce_job_reduces, as Hadoop and
+# run_local.py export it), and run_local.py refuses --reducers above 1.
+import os
+import argparse
+
+from aggregate import Reducer, add_reducer_arguments, reduce_totals, write_partials
+from named_outputs import NamedOutputs
+from taxi_parser import format_cents, to_cents
+
+ROLLUPS = ("hour", "day", "month", "quarter", "year")
+
+
+class HourReducer(Reducer):
+    def parse(self, key, text):
+        # Mapper and combiner values are "trips,fare,passengers,distance" with
+        # the fare in cents; final results are tab-separated, the fare in dollars
+        if '\t' in text:
+            trips, fare, passengers, distance = text.split('\t')
+            return [int(trips), to_cents(fare), float(passengers), float(distance)]
+        trips, fare, passengers, distance = text.split(',')
+        return [int(trips), int(fare), float(passengers), float(distance)]
+
+    def parse_value(self, key, value):
+        trips, fare, passengers, distance = value
+        return [int(trips), int(fare), float(passengers), float(distance)]
+
+    def merge(self, total, value):
+        for i, v in enumerate(value):
+            total[i] += v
+        return total
+
+    def format(self, key, total):
+        trips, fare, passengers, distance = total
+        return f"{trips}\t{format_cents(fare)}\t{passengers}\t{distance}"
+
+    def format_partial(self, key, total):
+        return ",".join(str(v) for v in total)
+
+
+def periods(hour):
+    """The day, month, quarter and year an hour key belongs to"""
+    day = hour[:10]
+    month = hour[:7]
+    quarter = f"{hour[:4]}-Q{(int(hour[5:7]) - 1) // 3 + 1}"
+    return day, month, quarter, hour[:4]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reduce hourly trip totals with day/month/quarter/year roll-ups")
+    add_reducer_arguments(parser)
+    parser.add_argument("--output-dir", help="write one output_<rollup> folder per roll-up here")
+    parser.add_argument("--part", type=int, default=0, help="part file number for --output-dir")
+    args = parser.parse_args()
+    reduces = int(os.environ.get("mapreduce_job_reduces", "1"))
+    if not args.combiner and reduces > 1:
+        parser.error(f"the roll-ups need every hour in one reducer, not {reduces}; run with -numReduceTasks 1")
+
+    reducer = HourReducer()
+    results = reduce_totals(reducer, args)
+    if args.combiner:
+        write_partials(reducer, args, results)
+        return
+
+    outputs = NamedOutputs(args.output_dir, args.part) if args.output_dir else None
+
+    def write(rollup, key, total):
+        record = f"{key}\t{reducer.format(key, total)}"
+        if outputs:
+            outputs.write(f"trip_totals_per_{rollup}", record)
+        else:
+            print(f"trip_totals_per_{rollup}\t{record}")
+
+    # Hours arrive in order; coarser periods are small enough to keep in dicts
+    rollups = {rollup: {} for rollup in ROLLUPS[1:]}
+    for hour, total in results:
+        write("hour", hour, total)
+        for rollup, period in zip(ROLLUPS[1:], periods(hour)):
+            totals = rollups[rollup]
+            if period in totals:
+                reducer.merge(totals[period], total)
+            else:
+                totals[period] = list(total)
+
+    for rollup in ROLLUPS[1:]:
+        for period in sorted(rollups[rollup]):
+            write(rollup, period, rollups[rollup][period])
+    if outputs:
+        outputs.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# Incremental refresh of the MapReduce outputs as new monthly files arrive.
+#
+# Each input file is mapped once per job and reduced with --combiner into a
+# sorted partial aggregate kept in the --state folder. A manifest records the
+# size, mtime and sha256 of every processed input, so a rerun only maps the
+# files given with --input that are new or changed, and then re-reduces the
+# partials of every input seen so far into output_<job>/part-00000 (older
+# part files are removed). The cost grows with the new data, not with the
+# whole history.
+#
+# Inputs from earlier runs keep their partials when they are not given
+# again, even once the file itself is gone; one that is still on disk but
+# has changed is mapped again. --remove drops an input's partials.
+#
+# Partials are keyed by the dates of the trips inside each file, so trips that
+# fall outside their file's month (2008-12-31, 2022-...) are merged into the
+# right day whichever file they came from.
+#
+#   python refresh.py --input /data/yellow_tripdata_2025-*.csv \
+#       --state /home/negukhula/refresh_state --output /home/negukhula
+#   python refresh.py --input /data/yellow_tripdata_2026-01.csv \
+#       --state /home/negukhula/refresh_state --output /home/negukhula
+#
+# To start from a cluster run instead of mapping the history again, copy its
+# output_<job> folders down (hdfs dfs -get) and pass their parent as --seed
+# on the first refresh, with only the months that run did not cover as
+# --input. The reducers read their own final output, so each job's part
+# files become one more partial; --remove <seed folder> drops it again.
+#
+#   python refresh.py --seed /home/negukhula/cluster_outputs \
+#       --input /data/yellow_tripdata_2026-01.csv --state ... --output ...
+import os
+import sys
+import glob
+import json
+import heapq
+import shutil
+import hashlib
+import argparse
+import tempfile
+from operator import itemgetter
+
+from compression import open_compressed
+from run_local import (COPY_BUFFER, compute_splits, input_header, read_sorted, run_job, run_piped,
+                       script_command, split_key)
+
+# job name -> (mapper, reducer, key fields); outputs go to output_<job>
+JOBS = {
+    "trips_per_day": ("mapper_trips_per_day.py --combine", "reducer_trips_per_day.py", 1),
+    "fare_per_day": ("mapper_fare_per_day.py --combine", "reducer_fare_per_day.py", 1),
+    "passenger_distance_per_day": ("mapper_passenger_distance_per_day.py --combine",
+                                   "reducer_passenger_distance_per_day.py", 1),
+    "revenue_per_day": ("mapper_revenue_per_day.py --combine", "reducer_revenue_per_day.py", 1),
+    "trips_per_payment": ("mapper_trips_per_payment.py --combine", "reducer_trips_per_payment.py", 1),
+    "trips_per_pulocation": ("mapper_trips_per_pulocation.py --combine", "reducer_trips_per_pulocation.py", 1),
+}
+MANIFEST = "manifest.json"
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_BUFFER), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(state_dir):
+    path = os.path.join(state_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(state_dir, manifest):
+    path = os.path.join(state_dir, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def input_entry(path, previous):
+    """Size, mtime and checksum of an input; the checksum is reused while size and mtime match"""
+    stat = os.stat(path)
+    if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+        checksum = previous["sha256"]
+    else:
+        checksum = file_checksum(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": checksum, "jobs": []}
+
+
+def partial_path(state_dir, job_name, path):
+    name = hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(state_dir, "partials", job_name, f"{name}.txt")
+
+
+def map_partial(path, job_name, state_dir, workers, split_size):
+    """Map one input file and reduce it with --combiner into its sorted partial"""
+    mapper, reducer, key_fields = JOBS[job_name]
+    work_dir = tempfile.mkdtemp(prefix="refresh-")
+    output = os.path.join(work_dir, "output")
+    os.makedirs(output)
+    job = {
+        "mapper": script_command(mapper),
+        "reducer": script_command(f"{reducer} --combiner"),
+        "combiner": None,
+        "reducers": 1,
+        "key_fields": key_fields,
+        "split_points": None,
+        "binary": False,
+        "map_output_codec": None,
+        "output_codec": None,
+        "work_dir": work_dir,
+        "output": output,
+        "env": {**os.environ, "TAXI_COUNTERS_DIR": os.path.join(work_dir, "counters")},
+        "headers": {path: input_header(path)},
+    }
+    try:
+        [part] = run_job(job, compute_splits(path, split_size), workers)
+        target = partial_path(state_dir, job_name, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(part, target)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def seed_partial(job_name, seed_dir, state_dir):
+    """Make the part files of seed_dir/output_<job> (a finished run) one sorted partial; False if absent"""
+    parts = sorted(path for path in glob.glob(os.path.join(seed_dir, f"output_{job_name}", "part-*"))
+                   if not path.endswith((".crc", ".idx")))
+    if not parts:
+        return False
+    key_fields = JOBS[job_name][2]
+    lines = []
+    for part in parts:
+        with open_compressed(part, "rb") as f:
+            lines.extend(line if line.endswith(b"\n") else line + b"\n" for line in f if line.strip())
+    lines.sort(key=lambda line: split_key(line, key_fields))
+    target = partial_path(state_dir, job_name, seed_dir)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as out:
+        out.writelines(lines)
+    return True
+
+
+def merge_partials(job_name, partials, output_root):
+    """Re-reduce the sorted partials of every input into output_<job>/part-00000"""
+    _, reducer, key_fields = JOBS[job_name]
+    streams = [read_sorted(path, key_fields) for path in partials]
+    merged = (line for _, line in heapq.merge(*streams, key=itemgetter(0)))
+    output = os.path.join(output_root, f"output_{job_name}")
+    os.makedirs(output, exist_ok=True)
+    part = os.path.join(output, "part-00000")
+    tmp = os.path.join(output, ".part-00000.tmp")
+    with open(tmp, "wb") as out:
+        for line in run_piped(script_command(reducer), merged):
+            out.write(line)
+    # Part files of an earlier (multi-reducer or cluster) run would be read alongside the new one
+    for name in os.listdir(output):
+        if name.startswith("part-") and name != "part-00000":
+            os.remove(os.path.join(output, name))
+    os.replace(tmp, part)
+    open(os.path.join(output, "_SUCCESS"), "w").close()
+    return part
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map only new or changed inputs and merge them into the outputs")
+    parser.add_argument("--input", nargs="+", default=[], help="new or changed input CSVs")
+    parser.add_argument("--remove", nargs="+", default=[], help="earlier inputs (or --seed folders) to drop")
+    parser.add_argument("--seed", help="folder of output_<job> folders from an earlier run whose inputs are not given")
+    parser.add_argument("--state", required=True, help="folder for the manifest and per-input partials")
+    parser.add_argument("--output", required=True, help="folder holding the output_<job> folders")
+    parser.add_argument("--jobs", nargs="+", choices=sorted(JOBS), default=sorted(JOBS), help="jobs to refresh")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parallel processes")
+    parser.add_argument("--split-size", type=int, default=128, help="map split size in MB")
+    args = parser.parse_args()
+
+    missing = [path for path in args.input if not os.path.exists(path)]
+    if missing:
+        print(f"❌ Input not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    os.makedirs(args.state, exist_ok=True)
+    previous = load_manifest(args.state)
+    removed = {os.path.abspath(path) for path in args.remove}
+    for path in removed - set(previous):
+        print(f"⚠️ Not an earlier input, nothing to remove: {path}")
+    manifest = {path: entry for path, entry in previous.items() if path not in removed}
+
+    if args.seed:
+        seed = os.path.abspath(args.seed)
+        if seed in manifest:
+            print(f"❌ {seed} is already part of the state; --remove it first to seed it again")
+            sys.exit(1)
+        jobs = [job_name for job_name in args.jobs if seed_partial(job_name, seed, args.state)]
+        print(f"Seeded {', '.join(jobs) or 'no jobs'} from {seed}")
+        manifest[seed] = {"seed": True, "jobs": jobs}
+        save_manifest(args.state, manifest)
+
+    # The given inputs, and earlier ones still on disk in case they have changed since
+    given = {os.path.abspath(path) for path in args.input}
+    earlier = {path for path, entry in manifest.items() if not entry.get("seed") and os.path.exists(path)}
+    for path in sorted(given | earlier):
+        old = manifest.get(path)
+        entry = input_entry(path, old)
+        unchanged = old is not None and old["sha256"] == entry["sha256"]
+        for job_name in args.jobs:
+            if unchanged and job_name in old["jobs"] and os.path.exists(partial_path(args.state, job_name, path)):
+                entry["jobs"].append(job_name)
+                continue
+            print(f"Mapping {path} for {job_name}")
+            map_partial(path, job_name, args.state, args.workers, args.split_size * 1024 * 1024)
+            entry["jobs"].append(job_name)
+        # Partials of jobs not refreshed this time stay valid while the file is unchanged
+        if unchanged:
+            entry["jobs"] += [job for job in old["jobs"] if job not in entry["jobs"]]
+        manifest[path] = entry
+        save_manifest(args.state, manifest)
+
+    for path in removed & set(previous):
+        print(f"Dropping partials of removed input {path}")
+        for job_name in JOBS:
+            partial = partial_path(args.state, job_name, path)
+            if os.path.exists(partial):
+                os.remove(partial)
+    save_manifest(args.state, manifest)
+
+    for job_name in args.jobs:
+        partials = []
+        for path in sorted(manifest):
+            partial = partial_path(args.state, job_name, path)
+            if job_name in manifest[path]["jobs"] and os.path.exists(partial):
+                partials.append(partial)
+            elif not manifest[path].get("seed"):
+                # An input gone from disk before this job was added has nothing to contribute
+                print(f"⚠️ {job_name} has no partial for {path}; its output leaves that input out")
+        part = merge_partials(job_name, partials, args.output)
+        print(f"✅ {job_name}: {len(partials)} partials merged into {part}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# Run a streaming mapper/reducer pair on one machine across a process pool.
+#
+# The input is cut into newline-aligned byte ranges (one map task each),
+# map output is hash-partitioned and sorted the way Hadoop does it, and one
+# reduce task per partition writes part-NNNNN, followed by _SUCCESS:
+#
+#   python run_local.py --input nyc_all_yellow_taxi_data_2023_2025_combined.csv \
+#       --mapper "mapper_trips_per_day.py --combine" --reducer reducer_trips_per_day.py \
+#       --output ../../data/output_trips_per_day --reducers 4
+#
+# Partitions use the same hash as Hadoop's HashPartitioner on Text keys, so
+# every key lands in the same part file as on the cluster. With
+# --split-points (from total_order.py) each part file holds a contiguous,
+# ordered key range instead. The mapper and reducer counters (see
+# counters.py) are summed into _counters.json next to the part files.
+#
+# With --binary the map output is typedbytes (run the mapper, reducer and
+# combiner with --binary too) and is sorted on the raw key bytes.
+#
+# Compressed inputs (.bz2, .gz, .zst, .lz4) are decompressed on the fly;
+# files written by compression.py are split on their block boundaries.
+# --map-output-codec compresses the sorted map outputs and --output-codec
+# the part files (part-00000.bz2, ...), like Hadoop's compress options.
+import os
+import sys
+import json
+import time
+import heapq
+import shlex
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+from compression import CODECS, block_splits, codec_of, open_compressed, read_blocks, read_whole
+from counters import collect_counters
+from taxi_parser import is_header
+from typedbytes import read_raw_pairs
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COPY_BUFFER = 1 << 20
+# Jobs whose reducer needs every key: the hourly roll-ups span hours that
+# would land in different partitions
+SINGLE_REDUCER_SCRIPTS = ("mapper_trips_per_hour.py", "reducer_trips_per_hour.py")
+
+
+def single_reducer_job(*commands):
+    """The script among the commands that must run with one reducer, or None"""
+    for command in commands:
+        script = os.path.basename(shlex.split(command)[0]) if command else ""
+        if script in SINGLE_REDUCER_SCRIPTS:
+            return script
+    return None
+
+
+def script_command(command):
+    """Turn "script.py --flag" into an argv that runs the script from this folder"""
+    argv = shlex.split(command)
+    if argv[0].endswith(".py"):
+        argv = [sys.executable, os.path.join(HERE, argv[0])] + argv[1:]
+    return argv
+
+
+def input_header(path):
+    """The CSV header line of an input file, or None when it has none"""
+    with open_compressed(path, "rb") as f:
+        first_line = f.readline().decode("utf-8", errors="replace").strip()
+    return first_line if is_header(first_line) else None
+
+
+def split_env(env, headers, path):
+    """Environment for a map task: splits after the first do not see the CSV
+    header, so each one is given the header of its own input file"""
+    header = headers.get(path)
+    return {**env, "TAXI_HEADER": header} if header else env
+
+
+def compute_splits(path, split_size):
+    """Return (path, start, end) byte ranges that begin and end on line boundaries"""
+    size = os.path.getsize(path)
+    if codec_of(path):
+        # Block boundaries of an indexed file, else the whole file as one split
+        return block_splits(path, split_size) or [(path, 0, size)]
+    boundaries = [0]
+    with open(path, "rb") as f:
+        offset = split_size
+        while offset < size:
+            f.seek(offset)
+            f.readline()
+            boundary = f.tell()
+            if boundary >= size:
+                break
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+            offset = boundary + split_size
+    boundaries.append(size)
+    return [(path, start, end) for start, end in zip(boundaries, boundaries[1:])]
+
+
+def read_split(path, start, end):
+    """Yield the (decompressed) bytes of one split in large chunks"""
+    if codec_of(path):
+        if start == 0 and end == os.path.getsize(path):
+            # One split covers every block, so stream the file as a whole
+            yield from read_whole(path)
+        else:
+            yield from read_blocks(path, start, end)
+        return
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(COPY_BUFFER, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def hadoop_hash(key):
+    """Text.hashCode(): WritableComparator.hashBytes over the UTF-8 bytes"""
+    h = 1
+    for b in key:
+        h = (31 * h + (b - 256 if b > 127 else b)) & 0xFFFFFFFF
+    return h
+
+
+def partition_of(key, num_partitions):
+    """HashPartitioner: (hashCode & Integer.MAX_VALUE) % numReduceTasks"""
+    return (hadoop_hash(key) & 0x7FFFFFFF) % num_partitions
+
+
+def split_key(line, key_fields):
+    fields = line.rstrip(b"\n").split(b"\t", key_fields)
+    return b"\t".join(fields[:key_fields])
+
+
+def feed(stdin, chunks):
+    try:
+        for chunk in chunks:
+            stdin.write(chunk)
+    except BrokenPipeError:
+        pass
+    finally:
+        stdin.close()
+
+
+def run_piped(argv, chunks, env=None, records=iter):
+    """Run a command with the chunks on stdin and yield its output lines
+    (or whatever ``records`` reads from its stdout)"""
+    proc = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=HERE, env=env)
+    writer = threading.Thread(target=feed, args=(proc.stdin, chunks), daemon=True)
+    writer.start()
+    for record in records(proc.stdout):
+        yield record
+    writer.join()
+    if proc.wait() != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited with status {proc.returncode}")
+
+
+def keyed_lines(lines, key_fields):
+    for line in lines:
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        yield split_key(line, key_fields), line
+
+
+def keyed_output(argv, chunks, job, env=None):
+    """Yield (key, record) for the output of a mapper or combiner"""
+    if job["binary"]:
+        return run_piped(argv, chunks, env, read_raw_pairs)
+    return keyed_lines(run_piped(argv, chunks, env), job["key_fields"])
+
+
+def map_task(task_id, split, job):
+    """Run the mapper on one split and write one sorted file per partition"""
+    path, start, end = split
+    num_partitions = job["reducers"]
+    split_points = job["split_points"]
+    partitions = [[] for _ in range(num_partitions)]
+
+    env = split_env(job["env"], job["headers"], path)
+    for key, line in keyed_output(job["mapper"], read_split(path, start, end), job, env):
+        if split_points is not None:
+            # Total order: partition i gets split_points[i-1] <= key < split_points[i]
+            partition = bisect_right(split_points, key)
+        elif num_partitions > 1:
+            partition = partition_of(key, num_partitions)
+        else:
+            partition = 0
+        partitions[partition].append((key, line))
+
+    outputs = []
+    for partition, records in enumerate(partitions):
+        records.sort(key=itemgetter(0))
+        lines = [line for _, line in records]
+        if job["combiner"] and lines:
+            lines = [line for _, line in keyed_output(job["combiner"], lines, job)]
+        out_path = os.path.join(job["work_dir"], f"map-{task_id:05d}-part-{partition:05d}")
+        if job["map_output_codec"]:
+            out_path += CODECS[job["map_output_codec"]]
+        with open_compressed(out_path, "wb") as out:
+            out.writelines(lines)
+        outputs.append(out_path)
+    return outputs
+
+
+def read_sorted(path, key_fields, binary=False):
+    with open_compressed(path, "rb") as f:
+        if binary:
+            yield from read_raw_pairs(f)
+            return
+        for line in f:
+            yield split_key(line, key_fields), line
+
+
+def reduce_task(partition, map_outputs, job):
+    """Merge the sorted map outputs of one partition through the reducer"""
+    streams = [read_sorted(path, job["key_fields"], job["binary"]) for path in map_outputs]
+    merged = (line for _, line in heapq.merge(*streams, key=itemgetter(0)))
+    out_path = os.path.join(job["output"], f"part-{partition:05d}")
+    if job["output_codec"]:
+        out_path += CODECS[job["output_codec"]]
+    with open_compressed(out_path, "wb") as out:
+        for line in run_piped(job["reducer"], merged, job["env"]):
+            out.write(line)
+    return out_path
+
+
+def run_job(job, splits, workers):
+    """Run the map and reduce phases and return the part files"""
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(map_task, i, split, job) for i, split in enumerate(splits)]
+        map_outputs = [future.result() for future in futures]
+        print(f"Map phase: {len(splits)} tasks in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        futures = [
+            pool.submit(reduce_task, partition, [outputs[partition] for outputs in map_outputs], job)
+            for partition in range(job["reducers"])
+        ]
+        parts = [future.result() for future in futures]
+        print(f"Reduce phase: {job['reducers']} tasks in {time.perf_counter() - started:.1f}s")
+    return parts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a streaming MapReduce job locally in parallel")
+    parser.add_argument("--input", nargs="+", required=True, help="input CSV file(s), plain or compressed")
+    parser.add_argument("--output", required=True, help="output directory (must not exist)")
+    parser.add_argument("--mapper", required=True, help='mapper command, e.g. "mapper_trips_per_day.py --combine"')
+    parser.add_argument("--reducer", required=True, help="reducer command")
+    parser.add_argument("--combiner", help="combiner command run on each sorted map partition")
+    parser.add_argument("--reducers", type=int, default=1, help="number of reduce partitions")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parallel processes")
+    parser.add_argument("--split-size", type=int, default=128, help="map split size in MB")
+    parser.add_argument("--key-fields", type=int, default=1,
+                        help="tab-separated fields in the key (stream.num.map.output.key.fields)")
+    parser.add_argument("--split-points", help="total-order split points file from total_order.py")
+    parser.add_argument("--binary", action="store_true", help="map output is typedbytes (mapper --binary)")
+    parser.add_argument("--map-output-codec", choices=sorted(CODECS), help="compress the intermediate map output")
+    parser.add_argument("--output-codec", choices=sorted(CODECS), help="compress the part files")
+    args = parser.parse_args()
+
+    single = single_reducer_job(args.mapper, args.reducer)
+    if single and args.reducers > 1:
+        print(f"❌ The {single} job rolls up across keys and needs --reducers 1")
+        sys.exit(1)
+
+    split_points = None
+    if args.split_points and args.binary:
+        print("❌ --split-points holds text keys and cannot be used with --binary")
+        sys.exit(1)
+    if args.split_points:
+        from total_order import read_split_points
+        split_points = read_split_points(args.split_points)
+        if len(split_points) != args.reducers - 1:
+            print(f"❌ {args.split_points} has {len(split_points)} split points, "
+                  f"expected {args.reducers - 1} for {args.reducers} reducers")
+            sys.exit(1)
+
+    if os.path.exists(args.output):
+        print(f"❌ Output directory already exists: {args.output}")
+        sys.exit(1)
+
+    env = dict(os.environ)
+    # Inputs may mix layouts (yellow and green, reordered columns)
+    headers = {path: input_header(path) for path in args.input}
+
+    splits = []
+    for path in args.input:
+        splits.extend(compute_splits(path, args.split_size * 1024 * 1024))
+
+    work_dir = tempfile.mkdtemp(prefix="run_local-")
+    os.makedirs(args.output)
+    env["TAXI_COUNTERS_DIR"] = os.path.join(work_dir, "counters")
+    # Hadoop Streaming exports the job configuration to its tasks the same way
+    env["mapreduce_job_reduces"] = str(args.reducers)
+    job = {
+        "mapper": script_command(args.mapper),
+        "reducer": script_command(args.reducer),
+        "combiner": script_command(args.combiner) if args.combiner else None,
+        "reducers": args.reducers,
+        "key_fields": args.key_fields,
+        "split_points": split_points,
+        "binary": args.binary,
+        "map_output_codec": args.map_output_codec,
+        "output_codec": args.output_codec,
+        "work_dir": work_dir,
+        "output": args.output,
+        "env": env,
+        "headers": headers,
+    }
+
+    started = time.perf_counter()
+    try:
+        run_job(job, splits, args.workers)
+        counters = collect_counters(env["TAXI_COUNTERS_DIR"])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    with open(os.path.join(args.output, "_counters.json"), "w") as f:
+        json.dump(counters, f, indent=2)
+    for group, values in counters.items():
+        print(f"{group}: " + ", ".join(f"{name}={value:,}" for name, value in values.items()))
+    open(os.path.join(args.output, "_SUCCESS"), "w").close()
+    print(f"✅ Job finished in {time.perf_counter() - started:.1f}s: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Header-driven trip record parsing shared by the streaming mappers.
+
+Column positions are resolved once, from the CSV header when the input
+split starts with one. Hadoop only gives the header to the first split, so
+the other splits fall back to the TAXI_HEADER environment variable (the
+full header line) or to the column layout named by TAXI_SCHEMA
+("yellow", the default, or "green"):
+
+    -cmdenv TAXI_SCHEMA=green
+
+Each row is split only as far as the last column the job needs, and pickup
+dates (and hours) are sliced from the timestamp and validated through a
+small memo cache instead of calling strptime on every row. Money columns
+are parsed into integer cents (to_cents) so that sums are exact and do not
+depend on the order they are added in.
+"""
+import os
+import sys
+import decimal
+import datetime
+
+YELLOW_COLUMNS = [
+    "VendorID", "tpep_pickup_datetime", "tpep_dropoff_datetime", "passenger_count",
+    "trip_distance", "RatecodeID", "store_and_fwd_flag", "PULocationID", "DOLocationID",
+    "payment_type", "fare_amount", "extra", "mta_tax", "tip_amount", "tolls_amount",
+    "improvement_surcharge", "total_amount", "congestion_surcharge", "Airport_fee",
+    "cbd_congestion_fee",
+]
+
+GREEN_COLUMNS = [
+    "VendorID", "lpep_pickup_datetime", "lpep_dropoff_datetime", "store_and_fwd_flag",
+    "RatecodeID", "PULocationID", "DOLocationID", "passenger_count", "trip_distance",
+    "fare_amount", "extra", "mta_tax", "tip_amount", "tolls_amount", "ehail_fee",
+    "improvement_surcharge", "total_amount", "payment_type", "trip_type",
+    "congestion_surcharge", "cbd_congestion_fee",
+]
+
+SCHEMAS = {"yellow": YELLOW_COLUMNS, "green": GREEN_COLUMNS}
+
+# Field name used by the mappers -> accepted column names (case-insensitive)
+FIELDS = {
+    "pickup": ("tpep_pickup_datetime", "lpep_pickup_datetime"),
+    "dropoff": ("tpep_dropoff_datetime", "lpep_dropoff_datetime"),
+    "passengers": ("passenger_count",),
+    "distance": ("trip_distance",),
+    "pulocation": ("PULocationID",),
+    "dolocation": ("DOLocationID",),
+    "payment": ("payment_type",),
+    "fare": ("fare_amount",),
+    "extra": ("extra",),
+    "mta_tax": ("mta_tax",),
+    "tip": ("tip_amount",),
+    "tolls": ("tolls_amount",),
+    "improvement": ("improvement_surcharge",),
+    "congestion": ("congestion_surcharge",),
+    "airport": ("airport_fee",),
+    "cbd": ("cbd_congestion_fee",),
+    "total": ("total_amount",),
+}
+
+
+def is_header(line):
+    return "pickup_datetime" in line
+
+
+def resolve_columns(header, fields):
+    """Return the column index of each field, looked up by header name"""
+    names = [name.strip().strip('"').lower() for name in header.split(',')]
+    indexes = []
+    for field in fields:
+        for name in FIELDS[field]:
+            if name.lower() in names:
+                indexes.append(names.index(name.lower()))
+                break
+        else:
+            raise KeyError(f"no column for field '{field}' in header")
+    return indexes
+
+
+def default_header():
+    """Header to use for input splits that do not carry one"""
+    header = os.environ.get("TAXI_HEADER")
+    if header:
+        return header
+    schema = os.environ.get("TAXI_SCHEMA", "yellow").lower()
+    return ",".join(SCHEMAS[schema])
+
+
+class TripReader:
+    """Iterate CSV rows split just far enough to reach the requested fields.
+
+    ``columns`` holds the index of each requested field in the split rows.
+    When ``counters`` is given, the rows read are added to it at the end.
+    """
+
+    def __init__(self, fields, stream=None, counters=None):
+        self.stream = stream or sys.stdin
+        self.counters = counters
+        self.first = self.stream.readline()
+        if is_header(self.first):
+            header, self.first = self.first, None
+        else:
+            header = default_header()
+        self.columns = resolve_columns(header, fields)
+        self.maxsplit = max(self.columns) + 1
+
+    def __iter__(self):
+        maxsplit = self.maxsplit
+        rows = 0
+        try:
+            if self.first:
+                rows += 1
+                yield self.first.rstrip('\r\n').split(',', maxsplit)
+            for line in self.stream:
+                if len(line) > 1:
+                    rows += 1
+                    yield line.rstrip('\r\n').split(',', maxsplit)
+        finally:
+            if self.counters:
+                self.counters.incr("Rows read", rows)
+
+
+_dates = {}
+MAX_CACHED = 8192
+
+
+def _valid_date(text):
+    if len(text) != 10 or text[4] != '-' or text[7] != '-':
+        return False
+    try:
+        datetime.date(int(text[0:4]), int(text[5:7]), int(text[8:10]))
+    except ValueError:
+        return False
+    return True
+
+
+def pickup_date(timestamp):
+    """Return the "YYYY-MM-DD" prefix of a timestamp, or None if it is not a date"""
+    day = timestamp[:10]
+    try:
+        return _dates[day]
+    except KeyError:
+        pass
+    if len(_dates) >= MAX_CACHED:
+        _dates.clear()
+    value = day if _valid_date(day) else None
+    if value is None and timestamp[:1] in (' ', '"'):
+        value = pickup_date(timestamp.strip(' "'))
+    _dates[day] = value
+    return value
+
+
+_hours = {}
+
+
+def pickup_hour(timestamp):
+    """Return the "YYYY-MM-DD HH" prefix of a timestamp, or None if it is not valid"""
+    prefix = timestamp[:13]
+    try:
+        return _hours[prefix]
+    except KeyError:
+        pass
+    if len(_hours) >= MAX_CACHED:
+        _hours.clear()
+    date = pickup_date(prefix)
+    hour = prefix[11:13]
+    value = None
+    if date and prefix[10] in ' T' and hour.isdigit() and int(hour) < 24:
+        value = f"{date} {hour}"
+    _hours[prefix] = value
+    return value
+
+
+def to_number(text):
+    """Parse a numeric column, treating an empty value as 0"""
+    return float(text) if text.strip() else 0
+
+
+_cents = {}
+
+
+def _parse_cents(text):
+    text = text.strip()
+    negative = text[:1] == '-'
+    digits = text[1:] if negative or text[:1] == '+' else text
+    whole, _, fraction = digits.partition('.')
+    if (whole or fraction) and len(fraction) <= 2 and (whole.isdigit() or not whole) \
+            and (fraction.isdigit() or not fraction):
+        cents = int(whole or 0) * 100 + int(fraction.ljust(2, '0'))
+    else:
+        # Exponents or more than two decimals: round half-even to the nearest cent
+        try:
+            cents = int(decimal.Decimal(digits).scaleb(2).to_integral_value(decimal.ROUND_HALF_EVEN))
+        except (ArithmeticError, ValueError):
+            raise ValueError(f"not an amount: {text!r}") from None
+    return -cents if negative else cents
+
+
+def to_cents(text):
+    """Parse a money column ("12.5", "-0.50") into integer cents without float rounding"""
+    try:
+        return _cents[text]
+    except KeyError:
+        pass
+    if len(_cents) >= MAX_CACHED:
+        _cents.clear()
+    value = _cents[text] = _parse_cents(text)
+    return value
+
+
+def format_cents(cents):
+    """Exact decimal text of an amount in cents, e.g. 3704420 -> 37044.20"""
+    sign = '-' if cents < 0 else ''
+    whole, fraction = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{fraction:02d}"
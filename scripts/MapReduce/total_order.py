@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# Sampling-based total-order partitioning for multi-reducer jobs.
+#
+# A sample of map output keys is taken by running the mapper over the start
+# of evenly spaced input splits (like Hadoop's InputSampler.SplitSampler),
+# and N-1 split points are chosen so that each of the N reducers gets about
+# the same number of records. Part file i then holds one contiguous key
+# range, in the same byte order Hadoop sorts Text keys, so concatenating
+# part-00000..part-0000N gives globally sorted output. Keys that dominate the
+# sample (outlier or very busy dates) are not used twice as split points.
+#
+#   python total_order.py --input combined.csv --mapper mapper_trips_per_day.py \
+#       --reducers 8 --output split_points.txt --sequence-file _partition.lst
+#
+# Locally:   python run_local.py ... --reducers 8 --split-points split_points.txt
+# On Hadoop: hdfs dfs -put _partition.lst /MIT805A1/_partition.lst
+#            hadoop jar hadoop-streaming.jar -D mapreduce.job.reduces=8 \
+#                -D mapreduce.totalorderpartitioner.path=/MIT805A1/_partition.lst \
+#                -partitioner org.apache.hadoop.mapred.lib.TotalOrderPartitioner ...
+import os
+import random
+import struct
+import argparse
+import tempfile
+
+from compression import codec_of
+from run_local import (compute_splits, input_header, read_split, run_piped, script_command,
+                       single_reducer_job, split_env, split_key)
+
+DEFAULT_SAMPLES = 100000
+DEFAULT_SAMPLED_SPLITS = 10
+SAMPLE_BYTES = 4 * 1024 * 1024
+
+
+def choose_split_points(samples, num_partitions):
+    """Pick num_partitions-1 distinct split points from the sorted sample keys.
+
+    Same stepping as Hadoop's InputSampler.writePartitionFile: when a step
+    lands on the key of the previous split point, move past it.
+    """
+    samples = sorted(samples)
+    step = len(samples) / num_partitions
+    points = []
+    last = -1
+    for i in range(1, num_partitions):
+        k = round(step * i)
+        while last >= k and k < len(samples) and samples[last] == samples[k]:
+            k += 1
+        if k >= len(samples):
+            raise ValueError(f"the sample has too few distinct keys for {num_partitions} partitions")
+        points.append(samples[k])
+        last = k
+    return points
+
+
+def compressed_sample(path, start, end):
+    """Yield about SAMPLE_BYTES of whole lines from the start of a compressed split"""
+    data = b""
+    for chunk in read_split(path, start, end):
+        data += chunk
+        if len(data) >= SAMPLE_BYTES:
+            yield data[:data.rfind(b"\n") + 1]
+            return
+    yield data
+
+
+def sample_keys(paths, mapper, key_fields, num_samples, sampled_splits, split_size, env=None):
+    """Run the mapper over the start of evenly spaced splits and reservoir-sample its keys"""
+    env = env if env is not None else dict(os.environ)
+    headers = {path: input_header(path) for path in paths}
+    splits = []
+    for path in paths:
+        splits.extend(compute_splits(path, split_size))
+    stride = max(1, len(splits) // sampled_splits)
+    chosen = splits[::stride][:sampled_splits]
+
+    rng = random.Random(0)
+    samples = []
+    seen = 0
+    for path, start, end in chosen:
+        if codec_of(path):
+            sample = compressed_sample(path, start, end)
+        else:
+            sample_end = min(end, start + SAMPLE_BYTES)
+            with open(path, "rb") as f:
+                # Extend the sampled range to the end of its last line
+                f.seek(sample_end)
+                f.readline()
+                sample_end = min(end, f.tell())
+            sample = read_split(path, start, sample_end)
+        for line in run_piped(mapper, sample, split_env(env, headers, path)):
+            key = split_key(line, key_fields)
+            seen += 1
+            if len(samples) < num_samples:
+                samples.append(key)
+            else:
+                j = rng.randrange(seen)
+                if j < num_samples:
+                    samples[j] = key
+    return samples
+
+
+def read_split_points(path):
+    with open(path, "rb") as f:
+        return [line.rstrip(b"\n") for line in f if line.strip()]
+
+
+def write_vint(value):
+    """Hadoop WritableUtils.writeVInt encoding"""
+    if -112 <= value <= 127:
+        return struct.pack(">b", value)
+    length = -112
+    if value < 0:
+        value = ~value
+        length = -120
+    data = b""
+    while value:
+        data = bytes([value & 0xFF]) + data
+        value >>= 8
+    return struct.pack(">b", length - len(data)) + data
+
+
+def write_text(data):
+    return write_vint(len(data)) + data
+
+
+def write_sequence_file(path, keys):
+    """Write keys as a SequenceFile<Text, NullWritable> for TotalOrderPartitioner"""
+    sync = os.urandom(16)
+    with open(path, "wb") as f:
+        f.write(b"SEQ\x06")
+        f.write(write_text(b"org.apache.hadoop.io.Text"))
+        f.write(write_text(b"org.apache.hadoop.io.NullWritable"))
+        f.write(b"\x00\x00")  # not compressed, not block compressed
+        f.write(struct.pack(">i", 0))  # no metadata
+        f.write(sync)
+        for key in keys:
+            serialized = write_text(key)
+            f.write(struct.pack(">ii", len(serialized), len(serialized)))
+            f.write(serialized)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample map output keys and choose total-order split points")
+    parser.add_argument("--input", nargs="+", required=True, help="input CSV file(s)")
+    parser.add_argument("--mapper", required=True, help="mapper command (without --combine)")
+    parser.add_argument("--reducers", type=int, required=True, help="number of reduce partitions")
+    parser.add_argument("--output", required=True, help="text file for the split points, one per line")
+    parser.add_argument("--sequence-file", help="also write a Hadoop TotalOrderPartitioner partition file")
+    parser.add_argument("--key-fields", type=int, default=1, help="tab-separated fields in the key")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="keys kept in the sample")
+    parser.add_argument("--sampled-splits", type=int, default=DEFAULT_SAMPLED_SPLITS,
+                        help="input splits to sample from")
+    parser.add_argument("--split-size", type=int, default=128, help="split size in MB")
+    args = parser.parse_args()
+    single = single_reducer_job(args.mapper)
+    if single and args.reducers > 1:
+        parser.error(f"the {single} job rolls up across keys and needs a single reducer")
+
+    env = dict(os.environ)
+
+    # The sampling runs' counters are not wanted; keep them out of stderr
+    with tempfile.TemporaryDirectory(prefix="total_order-") as counters:
+        env["TAXI_COUNTERS_DIR"] = counters
+        samples = sample_keys(args.input, script_command(args.mapper), args.key_fields, args.samples,
+                              args.sampled_splits, args.split_size * 1024 * 1024, env)
+    points = choose_split_points(samples, args.reducers)
+
+    with open(args.output, "wb") as f:
+        for point in points:
+            f.write(point + b"\n")
+    print(f"✅ {len(points)} split points from {len(samples):,} sampled keys: {args.output}")
+
+    if args.sequence_file:
+        write_sequence_file(args.sequence_file, points)
+        print(f"✅ Partition file for TotalOrderPartitioner: {args.sequence_file}")
+
+
+if __name__ == "__main__":
+    main()
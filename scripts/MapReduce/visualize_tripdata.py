@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
 
+from output_loader import load_output
+
 # Base folder for MapReduce outputs
 BASE = "/home/negukhula"
 
@@ -12,20 +13,28 @@ outputs = {
     "output_fare_per_day": ("Total Fare per Day", "Date", "Total Fare (USD)"),
     "output_trips_per_pulocation": ("Trips per Pickup Location (Top 20)", "Pickup Location ID", "Trip Count"),
     "output_trips_per_payment": ("Trips per Payment Type", "Payment Type", "Trip Count"),
+    # Top-K lists from reducer_top_locations.py --output-dir (already ranked)
+    "output_top_pulocation": ("Busiest Pickup Locations", "Pickup Location ID", "Trip Count"),
+    "output_top_route": ("Busiest Routes (PU>DO)", "Route", "Trip Count"),
 }
 
 save_dir = os.path.join(BASE, "visualizations")
 os.makedirs(save_dir, exist_ok=True)
 
 for folder, (title, xlabel, ylabel) in outputs.items():
-    path = os.path.join(BASE, folder, "part-00000")
-    if not os.path.exists(path):
-        print(f"⚠️ Skipping {folder} — no output found.")
-        continue
+    path = os.path.join(BASE, folder)
 
-    # Read output
+    # Read every part file of the output (cached after the first run)
     try:
-        df = pd.read_csv(path, sep="\t", header=None, names=["key", "value"])
+        if folder.startswith("output_top_"):
+            df = load_output(path, ["group", "key", "value", "error"], text_columns=["key"])
+        elif "day" in folder:
+            df = load_output(path, ["key", "value"], date_column="key")
+        else:
+            df = load_output(path, ["key", "value"])
+    except FileNotFoundError as e:
+        print(f"⚠️ Skipping {folder} — {e}")
+        continue
     except Exception as e:
         print(f"Error reading {path}: {e}")
         continue
@@ -43,6 +52,17 @@ for folder, (title, xlabel, ylabel) in outputs.items():
         plt.grid(True)
         plt.tight_layout()
 
+    elif folder.startswith("output_top_"):
+        # Top-K over the whole period, computed in one pass by the heavy-hitter job
+        df = df[df["group"] == "all"].sort_values("value", ascending=False)
+        plt.figure(figsize=(10,5))
+        plt.bar(df["key"], df["value"], yerr=[[0] * len(df), df["error"]])
+        plt.title(title)
+        plt.xlabel(xlabel)
+        plt.ylabel(ylabel)
+        plt.xticks(rotation=90)
+        plt.tight_layout()
+
     elif "pulocation" in folder:
         # Top 20 busiest locations
         df = df.sort_values("value", ascending=False).head(20)
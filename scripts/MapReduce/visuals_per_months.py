@@ -1,20 +1,17 @@
 #!/usr/bin/env python3
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
 
+from output_loader import load_output
+
 # File paths
 BASE = "/home/negukhula"
-INPUT_PATH = os.path.join(BASE, "output_trips_per_day", "part-00000")
+INPUT_PATH = os.path.join(BASE, "output_trips_per_day")
 SAVE_DIR = os.path.join(BASE, "visualizations")
 os.makedirs(SAVE_DIR, exist_ok=True)
 
-# Read CSV (with headers)
-df = pd.read_csv(INPUT_PATH, sep="\t")
-
-# Ensure correct column names and datetime conversion
-df.columns = ["Date", "count_trips_per_day"]
-df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+# Read all part files (header rows dropped, Date parsed)
+df = load_output(INPUT_PATH, ["Date", "count_trips_per_day"], date_column="Date")
 
 # Extract month number and name
 df["month_num"] = df["Date"].dt.month
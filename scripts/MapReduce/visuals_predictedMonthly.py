@@ -4,20 +4,15 @@ import matplotlib.pyplot as plt
 from prophet import Prophet
 from datetime import datetime
 
-# === Load Data ===
-path = "/home/negukhula/output_trips_per_day/part-00000"
-
-# Skip header if it exists, handle both cases safely
-df = pd.read_csv(path, sep="\t", comment="#", header=0, names=["Date", "count_trips_per_day"])
+from output_loader import load_output
 
-# Drop rows that are clearly headers or invalid
-df = df[df["Date"].str.match(r"\d{4}-\d{2}-\d{2}", na=False)]
+# === Load Data ===
+path = "/home/negukhula/output_trips_per_day"
 
-# Parse dates explicitly
-df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d", errors="coerce")
-df = df.dropna(subset=["Date"])
+# All part files, with header and invalid rows dropped and dates parsed
+df = load_output(path, ["Date", "count_trips_per_day"], date_column="Date")
 df = df.sort_values("Date")
-df["count_trips_per_day"] = pd.to_numeric(df["count_trips_per_day"], errors="coerce").fillna(0)
+df["count_trips_per_day"] = df["count_trips_per_day"].fillna(0)
 
 # === Aggregate to Monthly Totals ===
 df_monthly = df.resample("MS", on="Date").sum().reset_index()